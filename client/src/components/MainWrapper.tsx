@@ -22,7 +22,7 @@ import GameOverScreen from "./GameOverScreen";
 import { useTranslation } from "react-i18next";
 import HomeScreen from "./HomeScreen";
 import type { IAchievement } from "../interfaces/IAchievement";
-import { answer_map } from "../utils/asnwer_map";
+import { fetchAnswerMap } from "../utils/asnwer_map";
 
 const TRANSITION_DURATION = 0.2;
 
@@ -114,6 +114,14 @@ const MainWrapper = () => {
     },
   });
 
+  const { data: answerMap } = useQuery({
+    queryKey: ["aliases"],
+    queryFn: fetchAnswerMap,
+    select: (data) => data.aliases,
+    staleTime: Infinity,
+    refetchOnWindowFocus: false,
+  });
+
   const { data: achievements } = useQuery({
     queryKey: ["achievements"],
     queryFn: async () => {
@@ -257,7 +265,7 @@ const MainWrapper = () => {
 
   function normalizeAnswer(raw: string): string {
     const cleaned = raw.trim().toLowerCase().toString();
-    return answer_map[cleaned] || cleaned;
+    return answerMap?.[cleaned] || cleaned;
   }
 
   const handleTrainingAnswer = (opt: string) => {
@@ -607,7 +615,6 @@ const MainWrapper = () => {
   //       isFullscreen={isFullscreenState}
   //       headerStyle={headerStyle}
   //       headerStyleFullscreen={headerStyleFullscreen}
-  //       userId={user.id}
   //       setTournamentGame={setTournamentGame}
   //       setTournamentGameStarted={setTournamentGameStarted}
   //     />
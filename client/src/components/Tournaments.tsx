@@ -3,8 +3,8 @@ import { useQuery } from "@tanstack/react-query";
 import request from "../utils/api";
 import type {
   ITournament,
+  ITournamentList,
   ITournamentParticipant,
-  
 } from "../interfaces/ITournament";
 import { backButton, invoice } from "@telegram-apps/sdk";
 import Header from "./Header";
@@ -17,7 +17,6 @@ interface TournamentsProps {
   isFullscreen: boolean;
   headerStyle: string;
   headerStyleFullscreen: string;
-  userId: number;
   setTournamentGame: (game: any) => void;
   setTournamentGameStarted: (val: boolean) => void;
 }
@@ -26,7 +25,6 @@ const Tournaments = ({
   isFullscreen,
   headerStyle,
   headerStyleFullscreen,
-  userId,
   setTournamentGame,
   setTournamentGameStarted,
 }: TournamentsProps) => {
@@ -42,15 +40,16 @@ const Tournaments = ({
   const { t } = useTranslation();
 
   const {
-    data: tournaments,
+    data,
     isLoading: loadingAll,
     isError: errorAll,
     refetch,
-  } = useQuery<ITournament[]>({
+  } = useQuery<ITournamentList>({
     queryKey: ["tournaments"],
     queryFn: async () => (await request("tournaments/all")).data,
     refetchOnWindowFocus: false,
   });
+  const tournaments = data?.tournaments;
 
   const handleParticipate = async (id: number) => {
     const response = await request(`tournaments/${id}/participate`, "POST");
@@ -88,10 +87,13 @@ const Tournaments = ({
   };
 
   const hasUserParticipated = (t: ITournament) =>
-    t.participants.some((p) => p.user_id === userId);
+    !!data?.joined.includes(t.tournament_id);
 
-  const openParticipantsModal = (list: ITournamentParticipant[]) => {
-    setSelectedParticipants(list);
+  const openParticipantsModal = async (tournamentId: number) => {
+    const res = await request(
+      `tournaments/${tournamentId}/participants?limit=100`
+    );
+    setSelectedParticipants(res.data.participants);
     setShowParticipantsModal(true);
   };
 
@@ -327,7 +329,7 @@ const Tournaments = ({
 
           {hasUserParticipated(tournament) &&
             tournament.started_at &&
-            tournament.participants.length >= tournament.min_participants && (
+            tournament.total_participants >= tournament.min_participants && (
               <button
                 onClick={() =>
                   handleStartTournamentGame(tournament.tournament_id)
@@ -339,7 +341,7 @@ const Tournaments = ({
             )}
 
           <button
-            onClick={() => openParticipantsModal(tournament.participants)}
+            onClick={() => openParticipantsModal(tournament.tournament_id)}
             className={`py-2 px-4 rounded-xl transition ${
               isDaily ? "bg-green-600 text-white" : "bg-primary text-white"
             }`}
@@ -15,10 +15,18 @@ export interface ITournament {
   tags: string[];
   difficulty_multiplier: number;
   base_score: number;
+  // Best participants only; see total_participants for the count.
   participants: ITournamentParticipant[];
+  total_participants: number;
   tries: number;
 }
 
+export interface ITournamentList {
+  tournaments: ITournament[];
+  // Tournaments the current user has joined.
+  joined: number[];
+}
+
 // LEGACY
 // export interface ITournamentPrizes {
 //   place: number;
@@ -1,5 +1,6 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from . import (
+    aliases,
     common,
     match,
     tournament,
@@ -9,12 +10,14 @@ from . import (
     payment,
     season,
 )
+from .utils import user_scope
 
 
 def setup_routers() -> APIRouter:
-    router = APIRouter()
+    router = APIRouter(dependencies=[Depends(user_scope)])
 
     router.include_router(common.router)
+    router.include_router(aliases.router)
     router.include_router(users.router)
     router.include_router(training_game.router)
     router.include_router(training_results.router)
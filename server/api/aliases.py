@@ -0,0 +1,68 @@
+"""Alias table loader and the alias bundle served to the client.
+
+The ``aliases`` table is read once at startup into a frozen mapping that
+backs both the server-side answer index and ``GET /api/aliases``. The
+bundle version is a hash of its content, so every worker serves the same
+ETag for the same data.
+"""
+
+import json
+from hashlib import sha256
+from types import MappingProxyType
+
+from fastapi import APIRouter, Depends, Request, Response
+from tortoise.signals import post_delete, post_save
+
+from db import Alias, Flag
+from .answer_matching import answer_index
+from .flag_catalog import STATS_FIELDS
+from .utils import auth
+
+router = APIRouter(prefix="/api/aliases", dependencies=[Depends(auth)])
+
+bundle = {"version": None, "etag": None, "body": b"{}"}
+
+
+async def load_aliases() -> None:
+    rows = await Alias.all().order_by("id").values_list("alias", "flag__name")
+    aliases = MappingProxyType({alias.lower(): name for alias, name in rows})
+    answer_index.load(aliases)
+
+    payload = json.dumps(dict(aliases), ensure_ascii=False, sort_keys=True)
+    version = sha256(payload.encode()).hexdigest()[:16]
+    body = json.dumps(
+        {"version": version, "aliases": dict(aliases)},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode()
+    bundle.update(version=version, etag=f'"{version}"', body=body)
+
+
+@router.get("")
+async def get_aliases(request: Request) -> Response:
+    headers = {"ETag": bundle["etag"], "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == bundle["etag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(bundle["body"], media_type="application/json", headers=headers)
+
+
+@post_save(Alias)
+async def _alias_saved(sender, instance, created, using_db, update_fields) -> None:
+    await load_aliases()
+
+
+@post_delete(Alias)
+async def _alias_deleted(sender, instance, using_db) -> None:
+    await load_aliases()
+
+
+@post_save(Flag)
+async def _flag_saved(sender, instance, created, using_db, update_fields) -> None:
+    if update_fields and STATS_FIELDS.issuperset(update_fields):
+        return
+    await load_aliases()
+
+
+@post_delete(Flag)
+async def _flag_deleted(sender, instance, using_db) -> None:
+    await load_aliases()
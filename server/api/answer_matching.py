@@ -0,0 +1,141 @@
+"""Fuzzy resolution of free-text answers to canonical flag names.
+
+Aliases are indexed by character trigrams once at load time, so a
+submission is only scored against the aliases it shares trigrams with
+instead of the whole alias table. When the question is known, the
+submission is first scored against the aliases of its own options only,
+with a plain edit-distance ratio: WRatio's partial matching would let a
+one-letter answer such as "a" match any option containing it.
+
+Global lookups are memoised in a bounded LRU cache, which is dropped
+whenever the index is reloaded (see :mod:`api.aliases`).
+"""
+
+from collections import defaultdict
+from collections.abc import Mapping
+from heapq import nlargest
+
+from rapidfuzz import fuzz
+from rapidfuzz.utils import default_process
+
+from .cache import LRUCache
+
+SCORE_CUTOFF = 80
+MAX_CANDIDATES = 40
+CACHE_SIZE = 4096
+
+
+def trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class AnswerIndex:
+    def __init__(self, aliases: Mapping[str, str]):
+        self.cache = LRUCache(CACHE_SIZE)
+        self.load(aliases)
+
+    def load(self, aliases: Mapping[str, str]) -> None:
+        """(Re)build the index from an alias -> canonical name mapping."""
+        self.aliases = aliases
+        self._keys = list(aliases)
+        self._processed = [default_process(key) for key in self._keys]
+
+        postings = defaultdict(list)
+        for idx, text in enumerate(self._processed):
+            for gram in trigrams(text):
+                postings[gram].append(idx)
+        self._postings = {gram: tuple(ids) for gram, ids in postings.items()}
+
+        groups = defaultdict(set)
+        for key, text in zip(self._keys, self._processed):
+            canonical = aliases[key]
+            groups[canonical.lower()].update((text, default_process(canonical)))
+        self._groups = {name: tuple(texts) for name, texts in groups.items()}
+        self.cache.clear()
+
+    def _candidates(self, processed_query: str) -> list[int]:
+        hits = defaultdict(int)
+        for gram in trigrams(processed_query):
+            for idx in self._postings.get(gram, ()):
+                hits[idx] += 1
+        return nlargest(MAX_CANDIDATES, hits, key=hits.__getitem__)
+
+    def extract_one(self, query: str) -> tuple[str, float] | None:
+        """Best scoring alias for ``query`` as ``(alias, score)``."""
+        processed_query = default_process(query)
+        if not processed_query:
+            return None
+
+        best_idx, best_score = None, 0.0
+        for idx in self._candidates(processed_query):
+            score = fuzz.WRatio(
+                processed_query, self._processed[idx], score_cutoff=best_score
+            )
+            if score > best_score:
+                best_idx, best_score = idx, score
+
+        if best_idx is None:
+            return None
+        return self._keys[best_idx], best_score
+
+    def match_within(
+        self, answer: str, names: list[str]
+    ) -> tuple[str | None, float]:
+        """Like :meth:`match`, but only considers the aliases of ``names``."""
+        processed_query = default_process(answer)
+        if not processed_query:
+            return None, 0.0
+
+        best_name, best_score = None, 0.0
+        for name in names:
+            choices = self._groups.get(name.lower()) or (default_process(name),)
+            for choice in choices:
+                score = fuzz.ratio(processed_query, choice, score_cutoff=best_score)
+                if score > best_score:
+                    best_name, best_score = name, score
+
+        if best_score < SCORE_CUTOFF:
+            return None, best_score
+        return best_name, best_score
+
+    def match(self, answer: str) -> tuple[str | None, float]:
+        """Canonical name and score for ``answer``, ``None`` below the cutoff."""
+        canonical = self.aliases.get(answer)
+        if canonical is not None:
+            return canonical, 100.0
+
+        key = answer.lower()
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        best = self.extract_one(answer)
+        if best is None or best[1] < SCORE_CUTOFF:
+            result = None, best[1] if best else 0.0
+        else:
+            result = self.aliases[best[0]], best[1]
+        self.cache.set(key, result)
+        return result
+
+    def resolve(self, answer: str, candidates: list[str] | None = None) -> str:
+        """Canonical name for ``answer``, or ``answer`` itself if nothing matches.
+
+        ``candidates`` are the names shown for the current question; they are
+        tried first and the global index is only consulted if none of them
+        clears the cutoff.
+        """
+        canonical = self.aliases.get(answer)
+        if canonical is not None:
+            return canonical
+
+        if candidates:
+            canonical, _ = self.match_within(answer, candidates)
+            if canonical is not None:
+                return canonical
+
+        canonical, _ = self.match(answer)
+        return canonical if canonical is not None else answer
+
+
+answer_index = AnswerIndex({})
@@ -1,8 +1,17 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse
 
 from aiogram.types import Update
+from aiogram.utils.web_app import WebAppInitData
 from config_reader import bot, dp, config
 
+from .answer_matching import answer_index
+from .leaderboard import leaderboards
+from .notifier import notifier
+from .question_pool import question_pool
+from .tournament_listing import tournament_listing
+from .utils import auth, auth_cache, user_cache
+
 router = APIRouter()
 
 
@@ -10,3 +19,22 @@ router = APIRouter()
 async def webhook(request: Request) -> None:
     update = Update.model_validate(await request.json(), context={"bot": bot})
     await dp.feed_update(bot, update)
+
+
+@router.get("/api/stats")
+async def get_stats(auth_data: WebAppInitData = Depends(auth)) -> JSONResponse:
+    """Cache and pool counters of this worker, for the admin only."""
+    if auth_data.user.id != config.ADMIN_ID:
+        raise HTTPException(403, {"error": "Forbidden"})
+
+    return JSONResponse(
+        {
+            "auth_cache": auth_cache.info(),
+            "user_cache": user_cache.info(),
+            "answer_cache": answer_index.cache.info(),
+            "question_pool": question_pool.info(),
+            "leaderboards": leaderboards.info(),
+            "notifier": notifier.info(),
+            "tournament_listing": tournament_listing.info(),
+        }
+    )
@@ -1,8 +1,11 @@
-from datetime import date
+from datetime import date, timedelta
+from time import perf_counter
+from tortoise import connections
 from tortoise.transactions import in_transaction
 from db import User, Season, SeasonPrize
-from config_reader import bot
 from config_reader import config
+from .leaderboard import leaderboards
+from .notifier import notifier
 
 LEADER_REWARDS = [9, 6, 3]
 BONUS_TRIES = [
@@ -15,49 +18,115 @@ BONUS_TRIES = [
     (31, 40, 3),
     (41, 50, 2),
 ]
-
-
-async def reset_today_casual_score():
-    """Сбрасываем today_casual_score и начисляем бонусы топ-3.
-    Отправляем отчет администраторам.
+RESET_CHUNK = 5_000
+# День награждается один раз: повторный запуск за тот же день пропускается.
+CLAIM_DAY_SQL = """
+INSERT INTO "daily_awards" ("day", "awarded_at") VALUES ($1, now())
+ON CONFLICT ("day") DO NOTHING
+RETURNING "day"
+"""
+# $1 - бонусы за места по порядку, $2 - день, за который награждаем.
+AWARD_TOP_SQL = """
+WITH "top" AS (
+    SELECT "id", row_number() OVER (
+        ORDER BY "today_casual_score" DESC, "id"
+    ) AS "place"
+    FROM "users"
+    WHERE "today_score_date" = $2 AND "today_casual_score" > 0
+    ORDER BY "today_casual_score" DESC, "id"
+    LIMIT cardinality($1::int[])
+)
+UPDATE "users" AS u
+SET "tries_left" = u."tries_left" + ($1::int[])["top"."place"]
+FROM "top"
+WHERE u."id" = "top"."id"
+RETURNING "top"."place", u."name", u."today_casual_score",
+          ($1::int[])["top"."place"] AS "bonus"
+"""
+
+# Отметка о сбросе отключает +3 попытки в /api/users/get до следующего дня.
+# $1 - дата сброса, $2 - последний обработанный id, $3 - размер чанка.
+STAMP_RESET_SQL = """
+WITH "chunk" AS (
+    SELECT "id" FROM "users"
+    WHERE "id" > $2
+    ORDER BY "id"
+    LIMIT $3
+)
+UPDATE "users" AS u
+SET "last_reset_date" = $1
+FROM "chunk"
+WHERE u."id" = "chunk"."id"
+RETURNING u."id"
+"""
+
+
+async def reset_today_casual_score(day: date | None = None):
+    """Начисляем бонусы топ-3 за прошедший день (по умолчанию вчера) и
+    очищаем дневной лидерборд. Отправляем отчет администраторам.
+
+    Очки в строках пользователей не обнуляются: очки с прошлой датой в
+    today_score_date и так считаются нулевыми. last_reset_date, как и
+    раньше, проставляется всем пользователям чанками по RESET_CHUNK.
+
+    Награжденные дни записываются в daily_awards, и повторный запуск за
+    тот же день ничего не делает.
     """
-    async with in_transaction():
-        top_users = await User.all().order_by("-today_casual_score").limit(3)
+    day = day or date.today() - timedelta(days=1)
+    db = connections.get("default")
+    async with in_transaction() as conn:
+        _, claimed = await conn.execute_query(CLAIM_DAY_SQL, [day])
+        if not claimed:
+            print(f"Day {day} was already awarded, skipping.")
+            return
+        _, awarded = await conn.execute_query(AWARD_TOP_SQL, [LEADER_REWARDS, day])
+
+    summary_lines = [
+        "📊 Ежедневный сброс очков завершён!",
+        "",
+        f"🏅 Топ-3 лидеров дня {day:%d.%m.%Y}:",
+    ]
+    for row in sorted(awarded, key=lambda row: row["place"]):
+        summary_lines.append(
+            f"{row['place']}. {row['name']} — +{row['bonus']} попыток "
+            f"(счёт: {row['today_casual_score']})"
+        )
+        print(
+            f"Awarded {row['bonus']} tries to {row['name']} "
+            f"(score={row['today_casual_score']})"
+        )
 
-        summary_lines = [
-            "📊 Ежедневный сброс очков завершён!",
-            "",
-            "🏅 Топ-3 лидеров дня:",
-        ]
+    await leaderboards.reset("today")
+    print("Today casual leaderboard reset completed.")
 
-        for idx, user in enumerate(top_users):
-            bonus_tries = LEADER_REWARDS[idx] if idx < len(LEADER_REWARDS) else 0
-            user.tries_left += bonus_tries
-            await user.save()
-
-            summary_lines.append(
-                f"{idx+1}. {user.name} — +{bonus_tries} попыток (счёт: {user.today_casual_score})"
-            )
-            print(
-                f"Awarded {bonus_tries} tries to {user.name} (score={user.today_casual_score})"
-            )
-
-        await User.all().update(today_casual_score=0, last_reset_date=date.today())
-        print("Today casual scores reset completed.")
-
-        summary_text = "\n".join(summary_lines)
-        admin_ids = (
-            config.ADMIN_ID
-            if isinstance(config.ADMIN_ID, (list, tuple))
-            else [config.ADMIN_ID]
+    # Каждый чанк - отдельная короткая транзакция по диапазону id.
+    started = perf_counter()
+    total, last_id = 0, -(2**63)
+    while True:
+        _, rows = await db.execute_query(
+            STAMP_RESET_SQL, [date.today(), last_id, RESET_CHUNK]
         )
+        if not rows:
+            break
+        last_id = max(row["id"] for row in rows)
+        total += len(rows)
+        if len(rows) < RESET_CHUNK:
+            break
+    elapsed = perf_counter() - started
+    print(f"last_reset_date stamped on {total} rows in {elapsed:.1f} s.")
+    summary_lines += ["", f"🗓 Отметка сброса: {total} строк за {elapsed:.1f} с"]
 
-        for admin_id in admin_ids:
-            try:
-                await bot.send_message(chat_id=admin_id, text=summary_text)
-                print(f"Summary sent to admin {admin_id}")
-            except Exception as e:
-                print(f"Failed to send summary to admin {admin_id}: {e}")
+    await notify_admins("\n".join(summary_lines))
+
+
+async def notify_admins(text: str) -> None:
+    admin_ids = (
+        config.ADMIN_ID
+        if isinstance(config.ADMIN_ID, (list, tuple))
+        else [config.ADMIN_ID]
+    )
+    stats = await notifier.send_all([(admin_id, text) for admin_id in admin_ids])
+    print(f"Summary sent to admins: {stats.summary()}")
 
 
 async def end_season_if_needed():
@@ -70,6 +139,7 @@ async def end_season_if_needed():
 
     print(f"Ending season: {season.title}")
     summary_lines = [f"🏁 Season '{season.title}' ended!"]
+    messages = []
 
     async with in_transaction():
         top_users = await User.all().order_by("-total_score").limit(50)
@@ -90,26 +160,13 @@ async def end_season_if_needed():
             await user.save()
 
             if message_text:
-                try:
-                    await bot.send_message(chat_id=user.id, text=message_text)
-                except Exception as e:
-                    print(f"Failed to send message to {user.name}: {e}")
+                messages.append((user.id, message_text))
 
         season.is_active = False
         await season.save()
 
-    summary_text = "\n".join(summary_lines)
-
-    admin_ids = (
-        config.ADMIN_ID
-        if isinstance(config.ADMIN_ID, (list, tuple))
-        else [config.ADMIN_ID]
-    )
-
-    for admin_id in admin_ids:
-        try:
-            await bot.send_message(chat_id=admin_id, text=summary_text)
-        except Exception as e:
-            print(f"Failed to send summary to admin {admin_id}: {e}")
+    stats = await notifier.send_all(messages)
+    summary_lines += ["", stats.summary()]
+    await notify_admins("\n".join(summary_lines))
 
     print(f"Season '{season.title}' ended and rewards distributed.")
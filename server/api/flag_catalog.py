@@ -0,0 +1,294 @@
+"""Process-level snapshot of the flags table used by question generators.
+
+The catalog keeps flag attributes in parallel tuples plus per-category and
+per-tag index arrays, so sampling questions never touches Postgres. It is
+reloaded after ``CATALOG_TTL`` seconds or as soon as a flag or tag changes
+in this process.
+
+Questions are drawn through :class:`FlagSampler`, which keeps a selection
+split into difficulty buckets and picks flags by rejection sampling.
+"""
+
+import asyncio
+from itertools import chain
+from math import ceil
+from random import randrange, sample, shuffle
+from time import monotonic
+
+from tortoise.signals import post_delete, post_save
+
+from db import Flag, Tag
+
+CATALOG_TTL = 300
+
+# Flag saves touching only these fields do not invalidate the catalog.
+STATS_FIELDS = {"total_shown", "total_correct", "difficulty"}
+
+# Difficulty below EASY_MAX is easy, above HARD_MIN is hard, medium otherwise.
+EASY_MAX = 0.34
+HARD_MIN = 0.66
+NUM_OPTIONS = 7
+
+
+def _selection_key(categories: list[str] | None, tags: list[str] | None) -> tuple:
+    return (
+        tuple(sorted(categories)) if categories is not None else None,
+        tuple(sorted(tags)) if tags else None,
+    )
+
+
+class FlagSampler:
+    """Draws questions from a fixed selection of catalog indices."""
+
+    def __init__(self, catalog: "FlagCatalog", selection: tuple[int, ...]):
+        self.catalog = catalog
+        self.pool = selection
+
+        easy, medium, hard = [], [], []
+        for idx in selection:
+            difficulty = catalog.difficulties[idx]
+            if difficulty < EASY_MAX:
+                easy.append(idx)
+            elif difficulty > HARD_MIN:
+                hard.append(idx)
+            else:
+                medium.append(idx)
+        self.buckets = (tuple(easy), tuple(medium), tuple(hard))
+
+    def __len__(self) -> int:
+        return len(self.pool)
+
+    @staticmethod
+    def _draw(pool: tuple[int, ...], count: int, taken: set[int]) -> list[int]:
+        """Up to ``count`` distinct members of ``pool`` not in ``taken``.
+
+        Drawn indices are added to ``taken``.
+        """
+        drawn = []
+        attempts = 4 * count + 8 if pool else 0
+        while len(drawn) < count and attempts:
+            attempts -= 1
+            idx = pool[randrange(len(pool))]
+            if idx not in taken:
+                taken.add(idx)
+                drawn.append(idx)
+
+        if len(drawn) < count:
+            # The pool is nearly exhausted, fall back to an exact pass.
+            rest = [idx for idx in pool if idx not in taken]
+            extra = sample(rest, min(count - len(drawn), len(rest)))
+            taken.update(extra)
+            drawn += extra
+        return drawn
+
+    def draw(self, count: int, exclude: set[int] | None = None) -> list[int]:
+        """``count`` distinct flags from the whole selection."""
+        return self._draw(self.pool, count, set(exclude or ()))
+
+    def draw_balanced(self, count: int) -> list[int]:
+        """``count`` distinct flags spread over the difficulty buckets.
+
+        A third comes from each bucket; a bucket that runs short is topped
+        up from the whole selection.
+        """
+        num_easy = min(count, ceil(count * 0.33))
+        num_medium = min(count - num_easy, ceil(count * 0.33))
+        quotas = (num_easy, num_medium, count - num_easy - num_medium)
+
+        taken: set[int] = set()
+        selected = []
+        for bucket, quota in zip(self.buckets, quotas):
+            drawn = self._draw(bucket, quota, taken)
+            selected += drawn
+            selected += self._draw(self.pool, quota - len(drawn), taken)
+        shuffle(selected)
+        return selected
+
+    def options(self, flag: int) -> list[str]:
+        """Shuffled option names for ``flag``: the answer plus six distractors."""
+        names = self.catalog.names
+        options = [names[idx] for idx in self.draw(NUM_OPTIONS - 1, {flag})]
+        options.append(names[flag])
+        shuffle(options)
+        return options
+
+    def encode_question(self, flag: int) -> list[int]:
+        """Compact question for ``flag``: ``[flag_id, answer_pos, *distractor_ids]``.
+
+        The options are the distractors in drawn order with the answer
+        inserted at ``answer_pos``.
+        """
+        ids = self.catalog.ids
+        distractors = self.draw(NUM_OPTIONS - 1, {flag})
+        return [ids[flag], randrange(NUM_OPTIONS), *(ids[idx] for idx in distractors)]
+
+
+class FlagCatalog:
+    def __init__(self, flags: list[tuple], flag_tags: list[tuple], version: int):
+        self.version = version
+        self.loaded_at = monotonic()
+
+        if flags:
+            ids, names, images, difficulties, categories = zip(*flags)
+        else:
+            ids = names = images = difficulties = categories = ()
+        self.ids: tuple[int, ...] = ids
+        self.names: tuple[str, ...] = names
+        self.images: tuple[str, ...] = images
+        self.difficulties: tuple[float, ...] = difficulties
+        self.categories: tuple[str, ...] = categories
+        self.position = {flag_id: idx for idx, flag_id in enumerate(ids)}
+
+        by_category: dict[str, list[int]] = {}
+        for idx, category in enumerate(categories):
+            by_category.setdefault(category, []).append(idx)
+        self.by_category = {c: tuple(idxs) for c, idxs in by_category.items()}
+
+        by_tag: dict[str, list[int]] = {}
+        for tag, flag_id in flag_tags:
+            idx = self.position.get(flag_id)
+            if idx is not None:
+                by_tag.setdefault(tag, []).append(idx)
+        self.by_tag = {t: tuple(sorted(idxs)) for t, idxs in by_tag.items()}
+
+        self._selections: dict[tuple, tuple[int, ...]] = {}
+        self._samplers: dict[tuple, FlagSampler] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def decode_question(
+        self, question: list[int] | dict, mode: str | None, scored: bool = True
+    ) -> dict:
+        """Expand a question from :meth:`FlagSampler.encode_question`.
+
+        Unscored questions carry no difficulty and are worth one point.
+        Questions stored as dicts by older matches are returned unchanged.
+        A flag deleted since the question was drawn has no image and an
+        empty answer, so it can only be answered wrong.
+        """
+        if isinstance(question, dict):
+            return question
+
+        flag_id, answer_pos, *distractor_ids = question
+        options = [
+            self.names[self.position[idx]]
+            for idx in distractor_ids
+            if idx in self.position
+        ]
+        flag = self.position.get(flag_id)
+        if flag is None:
+            return {
+                "flag_id": flag_id,
+                "image": None,
+                "options": options,
+                "mode": mode,
+                "answer": "",
+            }
+        options.insert(answer_pos, self.names[flag])
+
+        decoded = {
+            "flag_id": flag_id,
+            "image": self.images[flag],
+            "options": options,
+            "mode": mode,
+            "answer": self.names[flag],
+        }
+        if scored:
+            decoded["difficulty"] = self.difficulties[flag]
+        return decoded
+
+    def select(
+        self, categories: list[str] | None = None, tags: list[str] | None = None
+    ) -> tuple[int, ...]:
+        """Indices of flags in any of ``categories`` carrying any of ``tags``."""
+        key = _selection_key(categories, tags)
+        selection = self._selections.get(key)
+        if selection is not None:
+            return selection
+
+        if categories is None:
+            indices = range(len(self.ids))
+        else:
+            indices = sorted(
+                chain.from_iterable(self.by_category.get(c, ()) for c in categories)
+            )
+        if tags:
+            tagged = set(chain.from_iterable(self.by_tag.get(t, ()) for t in tags))
+            indices = [idx for idx in indices if idx in tagged]
+
+        selection = self._selections[key] = tuple(indices)
+        return selection
+
+    def sampler(
+        self, categories: list[str] | None = None, tags: list[str] | None = None
+    ) -> FlagSampler:
+        key = _selection_key(categories, tags)
+        sampler = self._samplers.get(key)
+        if sampler is None:
+            sampler = self._samplers[key] = FlagSampler(
+                self, self.select(categories, tags)
+            )
+        return sampler
+
+
+_catalog: FlagCatalog | None = None
+_version = 0
+_lock = asyncio.Lock()
+
+
+def bump_version() -> None:
+    global _version
+    _version += 1
+
+
+def catalog_version() -> int:
+    return _version
+
+
+def _is_fresh(catalog: FlagCatalog | None) -> bool:
+    return (
+        catalog is not None
+        and catalog.version == _version
+        and monotonic() - catalog.loaded_at < CATALOG_TTL
+    )
+
+
+async def get_flag_catalog() -> FlagCatalog:
+    global _catalog
+    if _is_fresh(_catalog):
+        return _catalog
+
+    async with _lock:
+        if not _is_fresh(_catalog):
+            version = _version
+            flags = await Flag.all().order_by("id").values_list(
+                "id", "name", "image", "difficulty", "category"
+            )
+            flag_tags = await Tag.filter(flags__id__isnull=False).values_list(
+                "name", "flags__id"
+            )
+            _catalog = FlagCatalog(flags, flag_tags, version)
+    return _catalog
+
+
+@post_save(Flag)
+async def _flag_saved(sender, instance, created, using_db, update_fields) -> None:
+    if update_fields and STATS_FIELDS.issuperset(update_fields):
+        return
+    bump_version()
+
+
+@post_delete(Flag)
+async def _flag_deleted(sender, instance, using_db) -> None:
+    bump_version()
+
+
+@post_save(Tag)
+async def _tag_saved(sender, instance, created, using_db, update_fields) -> None:
+    bump_version()
+
+
+@post_delete(Tag)
+async def _tag_deleted(sender, instance, using_db) -> None:
+    bump_version()
@@ -0,0 +1,78 @@
+"""Write-behind aggregation of per-flag answer statistics.
+
+Answers only bump in-process counters; a background task periodically
+applies them to the ``flags`` table in a single set-based UPDATE, with the
+difficulty recomputed in SQL from the updated totals.
+"""
+
+import asyncio
+import logging
+
+from tortoise import connections
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 5
+
+FLUSH_SQL = """
+UPDATE "flags" AS f
+SET "total_shown" = f."total_shown" + v."shown",
+    "total_correct" = f."total_correct" + v."correct",
+    "difficulty" = 1 - (f."total_correct" + v."correct")::float
+        / (f."total_shown" + v."shown")
+FROM unnest($1::int[], $2::int[], $3::int[]) AS v ("id", "shown", "correct")
+WHERE f."id" = v."id"
+"""
+
+
+class FlagStatsBuffer:
+    def __init__(self, interval: float = FLUSH_INTERVAL):
+        self.interval = interval
+        self._deltas: dict[int, list[int]] = {}
+        self._task: asyncio.Task | None = None
+
+    def record(self, flag_id: int, is_correct: bool) -> None:
+        delta = self._deltas.setdefault(flag_id, [0, 0])
+        delta[0] += 1
+        if is_correct:
+            delta[1] += 1
+
+    async def flush(self) -> None:
+        if not self._deltas:
+            return
+        deltas, self._deltas = self._deltas, {}
+
+        ids = list(deltas)
+        try:
+            await connections.get("default").execute_query(
+                FLUSH_SQL,
+                [ids, [deltas[i][0] for i in ids], [deltas[i][1] for i in ids]],
+            )
+        except Exception:
+            logger.exception("Failed to flush stats for %d flags", len(ids))
+            for flag_id, (shown, correct) in deltas.items():
+                delta = self._deltas.setdefault(flag_id, [0, 0])
+                delta[0] += shown
+                delta[1] += correct
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+flag_stats = FlagStatsBuffer()
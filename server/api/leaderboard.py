@@ -0,0 +1,481 @@
+"""Casual, daily and training leaderboards.
+
+``LEADERBOARD_URL`` selects the backend:
+
+* unset - queries on the indexed score columns of ``users``, always in
+  step across workers;
+* ``memory://`` - sorted lists in the process, loaded from Postgres on
+  startup; only for single-process deployments and tests;
+* ``redis://...`` - sorted sets shared by all workers, rebuilt on startup.
+
+Boards are updated with the user's new totals wherever a score changes
+(:func:`api.match.complete_match`, the training score endpoint). Only
+positive scores are ranked, and a user's rank is one plus the number of
+users with a strictly higher score.
+
+Daily scores are stamped with the day they were earned and read as zero on
+any other day (:func:`today_score`), so a new day needs no bulk UPDATE; the
+daily board is just emptied.
+"""
+
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from datetime import date
+from uuid import uuid4
+
+from sortedcontainers import SortedList
+from tortoise.expressions import Q
+
+from config_reader import config
+from db import User
+
+# Board name -> User field it ranks.
+BOARDS = {
+    "casual": "casual_score",
+    "today": "today_casual_score",
+    "training": "training_score",
+}
+
+LOAD_CHUNK = 10_000
+
+
+def today_score(user: User, today: date | None = None) -> int:
+    """The daily casual score of ``user``, zero if earned on another day."""
+    if user.today_score_date != (today or date.today()):
+        return 0
+    return user.today_casual_score
+
+
+def add_today_score(user: User, points: int) -> None:
+    today = date.today()
+    user.today_casual_score = today_score(user, today) + points
+    user.today_score_date = today
+
+
+class Leaderboards(ABC):
+    def __init__(self):
+        # (board, count, field) -> (board version, JSON body, last entry)
+        self._json: dict[tuple, tuple[int, bytes, tuple | None]] = {}
+
+    async def rebuild(self) -> None:
+        """Reload every board from the users table."""
+        today = date.today()
+        ranked = (
+            Q(casual_score__gt=0)
+            | Q(training_score__gt=0)
+            | Q(today_casual_score__gt=0, today_score_date=today)
+        )
+        rows = await User.filter(ranked).values_list(
+            "id", "name", *BOARDS.values(), "today_score_date"
+        )
+        await self.load(
+            [
+                (uid, name, casual, daily if day == today else 0, training)
+                for uid, name, casual, daily, training, day in rows
+            ]
+        )
+
+    async def record(self, user: User) -> None:
+        """Store the current totals of ``user`` on every board."""
+        scores = {board: getattr(user, field) for board, field in BOARDS.items()}
+        scores["today"] = today_score(user)
+        await self.update(user.id, user.name, scores)
+
+    async def top_json(
+        self, board: str, count: int, field: str
+    ) -> tuple[bytes, tuple[int, str, int] | None]:
+        """:meth:`top` as a ``{user_id: {"name", field}}`` JSON object.
+
+        The body is rebuilt only when the board version changes. The last
+        entry is returned too when the page is full, for the next cursor.
+        """
+        version = await self.version(board)
+        key = (board, count, field)
+        cached = self._json.get(key)
+        if cached is None or cached[0] != version:
+            entries = await self.top(board, count)
+            body = json.dumps(
+                {uid: {"name": name, field: score} for uid, name, score in entries},
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ).encode()
+            last = entries[-1] if len(entries) == count else None
+            cached = self._json[key] = (version, body, last)
+        return cached[1], cached[2]
+
+    @abstractmethod
+    async def version(self, board: str) -> int:
+        """Changes whenever an entry of ``board`` does."""
+
+    @abstractmethod
+    async def load(self, rows: list[tuple]) -> None:
+        ...
+
+    @abstractmethod
+    async def update(self, user_id: int, name: str, scores: dict[str, int]) -> None:
+        ...
+
+    @abstractmethod
+    async def top(self, board: str, count: int) -> list[tuple[int, str, int]]:
+        """The ``count`` best ``(user_id, name, score)`` entries of ``board``."""
+
+    @abstractmethod
+    async def rank(self, board: str, user_id: int) -> int:
+        ...
+
+    @abstractmethod
+    async def page(
+        self, board: str, count: int, after: tuple[int, int] | None = None
+    ) -> list[tuple[int, str, int]]:
+        """Like :meth:`top`, but starting after the ``(score, user_id)`` entry."""
+
+    @abstractmethod
+    async def window(
+        self, board: str, user_id: int, radius: int
+    ) -> list[tuple[int, int, str, int]]:
+        """Up to ``radius`` entries on each side of ``user_id``, with ranks.
+
+        Entries are ``(rank, user_id, name, score)``. A user without a score
+        sits below the last entry of the board.
+        """
+
+    @abstractmethod
+    async def reset(self, board: str) -> None:
+        """Drop every score from ``board``."""
+
+    async def close(self) -> None:
+        pass
+
+    @abstractmethod
+    def info(self) -> dict:
+        ...
+
+
+class SqlLeaderboards(Leaderboards):
+    """Boards read from ``users`` on every call; nothing to load or update."""
+
+    def __init__(self):
+        super().__init__()
+        self._reads = 0
+
+    @staticmethod
+    def _ranked(board: str):
+        field = BOARDS[board]
+        ranked = User.filter(**{f"{field}__gt": 0})
+        if board == "today":
+            ranked = ranked.filter(today_score_date=date.today())
+        return ranked
+
+    async def _score(self, board: str, user_id: int) -> int:
+        row = await self._ranked(board).filter(id=user_id).values_list(BOARDS[board])
+        return row[0][0] if row else 0
+
+    async def _entries(self, ranked, field: str, count: int) -> list[tuple]:
+        return [
+            tuple(row)
+            for row in await ranked.order_by(f"-{field}", "id")
+            .limit(count)
+            .values_list("id", "name", field)
+        ]
+
+    async def rebuild(self) -> None:
+        pass
+
+    async def version(self, board: str) -> int:
+        # Other workers change the same rows, so cached bodies are never
+        # reused: every read gets a new version.
+        self._reads += 1
+        return self._reads
+
+    async def load(self, rows: list[tuple]) -> None:
+        pass
+
+    async def update(self, user_id: int, name: str, scores: dict[str, int]) -> None:
+        pass
+
+    async def top(self, board: str, count: int) -> list[tuple[int, str, int]]:
+        return await self._entries(self._ranked(board), BOARDS[board], count)
+
+    async def rank(self, board: str, user_id: int) -> int:
+        score = await self._score(board, user_id)
+        field = BOARDS[board]
+        return await self._ranked(board).filter(**{f"{field}__gt": score}).count() + 1
+
+    async def page(
+        self, board: str, count: int, after: tuple[int, int] | None = None
+    ) -> list[tuple[int, str, int]]:
+        field = BOARDS[board]
+        ranked = self._ranked(board)
+        if after:
+            score, user_id = after
+            ranked = ranked.filter(
+                Q(**{f"{field}__lt": score}) | Q(**{field: score, "id__gt": user_id})
+            )
+        return await self._entries(ranked, field, count)
+
+    async def window(
+        self, board: str, user_id: int, radius: int
+    ) -> list[tuple[int, int, str, int]]:
+        field = BOARDS[board]
+        ranked = self._ranked(board)
+        score = await self._score(board, user_id)
+        above, below = ranked, []
+        if score:
+            above = ranked.filter(
+                Q(**{f"{field}__gt": score}) | Q(**{field: score, "id__lt": user_id})
+            )
+            below = await self._entries(
+                ranked.filter(
+                    Q(**{f"{field}__lt": score})
+                    | Q(**{field: score, "id__gte": user_id})
+                ),
+                field,
+                radius + 1,
+            )
+        above = await (
+            above.order_by(field, "-id").limit(radius).values_list("id", "name", field)
+        )
+        entries = [tuple(row) for row in reversed(above)] + below
+        if not entries:
+            return []
+
+        # Only the best score of the window can have ties outside it, so two
+        # counts give the ranks of every score in it.
+        top_score = entries[0][2]
+        higher = await ranked.filter(**{f"{field}__gt": top_score}).count()
+        tied = await ranked.filter(**{field: top_score}).count()
+        ranks, passed = [], 0
+        for idx, (_, _, entry_score) in enumerate(entries):
+            if entry_score == top_score:
+                ranks.append(higher + 1)
+                continue
+            if entry_score == entries[idx - 1][2]:
+                ranks.append(ranks[-1])
+            else:
+                ranks.append(higher + tied + passed + 1)
+            passed += 1
+        return [(rank, *entry) for rank, entry in zip(ranks, entries)]
+
+    async def reset(self, board: str) -> None:
+        # Daily scores of other days are filtered out by today_score_date.
+        pass
+
+    def info(self) -> dict:
+        return {"backend": "sql"}
+
+
+class MemoryLeaderboards(Leaderboards):
+    def __init__(self):
+        super().__init__()
+        self._names: dict[int, str] = {}
+        self._scores: dict[str, dict[int, int]] = {board: {} for board in BOARDS}
+        # (-score, user_id), so the best scores come first.
+        self._order = {board: SortedList() for board in BOARDS}
+        self._versions = dict.fromkeys(BOARDS, 0)
+
+    async def version(self, board: str) -> int:
+        return self._versions[board]
+
+    @staticmethod
+    def _build(rows: list[tuple]) -> tuple[dict, dict, dict]:
+        names = {}
+        scores = {board: {} for board in BOARDS}
+        for user_id, name, *values in rows:
+            names[user_id] = name
+            for board, score in zip(BOARDS, values):
+                if score > 0:
+                    scores[board][user_id] = score
+        order = {
+            board: SortedList((-score, uid) for uid, score in board_scores.items())
+            for board, board_scores in scores.items()
+        }
+        return names, scores, order
+
+    async def load(self, rows: list[tuple]) -> None:
+        # Sorting every user takes seconds on big tables; keep it off the loop.
+        self._names, self._scores, self._order = await asyncio.to_thread(
+            self._build, rows
+        )
+        for board in BOARDS:
+            self._versions[board] += 1
+
+    async def update(self, user_id: int, name: str, scores: dict[str, int]) -> None:
+        renamed = self._names.get(user_id) != name
+        self._names[user_id] = name
+        for board, score in scores.items():
+            board_scores, order = self._scores[board], self._order[board]
+            old = board_scores.pop(user_id, None)
+            if old is not None:
+                order.remove((-old, user_id))
+            if score > 0:
+                board_scores[user_id] = score
+                order.add((-score, user_id))
+            if old != (score if score > 0 else None) or (renamed and old):
+                self._versions[board] += 1
+
+    async def top(self, board: str, count: int) -> list[tuple[int, str, int]]:
+        return [
+            (user_id, self._names.get(user_id, ""), -score)
+            for score, user_id in self._order[board].islice(0, count)
+        ]
+
+    def _rank(self, board: str, score: int) -> int:
+        return self._order[board].bisect_left((-score, float("-inf"))) + 1
+
+    async def rank(self, board: str, user_id: int) -> int:
+        return self._rank(board, self._scores[board].get(user_id, 0))
+
+    async def page(
+        self, board: str, count: int, after: tuple[int, int] | None = None
+    ) -> list[tuple[int, str, int]]:
+        order = self._order[board]
+        start = order.bisect_right((-after[0], after[1])) if after else 0
+        return [
+            (user_id, self._names.get(user_id, ""), -score)
+            for score, user_id in order.islice(start, start + count)
+        ]
+
+    async def window(
+        self, board: str, user_id: int, radius: int
+    ) -> list[tuple[int, int, str, int]]:
+        order = self._order[board]
+        score = self._scores[board].get(user_id)
+        pos = order.index((-score, user_id)) if score is not None else len(order)
+        return [
+            (self._rank(board, -score), uid, self._names.get(uid, ""), -score)
+            for score, uid in order.islice(max(pos - radius, 0), pos + radius + 1)
+        ]
+
+    async def reset(self, board: str) -> None:
+        self._scores[board] = {}
+        self._order[board] = SortedList()
+        self._versions[board] += 1
+
+    def info(self) -> dict:
+        return {board: len(order) for board, order in self._order.items()}
+
+
+class RedisLeaderboards(Leaderboards):
+    NAMES_KEY = "leaderboard:names"
+
+    def __init__(self, url: str):
+        from redis.asyncio import Redis
+
+        super().__init__()
+        self._redis = Redis.from_url(url, decode_responses=True)
+
+    @staticmethod
+    def _key(board: str) -> str:
+        return f"leaderboard:{board}"
+
+    async def version(self, board: str) -> int:
+        return int(await self._redis.get(f"{self._key(board)}:version") or 0)
+
+    async def load(self, rows: list[tuple]) -> None:
+        # Each board is built under a temporary key and swapped in at once.
+        for idx, board in enumerate(BOARDS):
+            key = self._key(board)
+            tmp_key = f"{key}:rebuild:{uuid4().hex}"
+            for start in range(0, len(rows), LOAD_CHUNK):
+                chunk = rows[start : start + LOAD_CHUNK]
+                scores = {row[0]: row[2 + idx] for row in chunk if row[2 + idx] > 0}
+                if scores:
+                    await self._redis.zadd(tmp_key, scores)
+            if await self._redis.exists(tmp_key):
+                await self._redis.rename(tmp_key, key)
+            else:
+                await self._redis.delete(key)
+            await self._redis.incr(f"{key}:version")
+
+        for start in range(0, len(rows), LOAD_CHUNK):
+            chunk = rows[start : start + LOAD_CHUNK]
+            await self._redis.hset(self.NAMES_KEY, mapping={r[0]: r[1] for r in chunk})
+
+    async def update(self, user_id: int, name: str, scores: dict[str, int]) -> None:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.hset(self.NAMES_KEY, user_id, name)
+            for board, score in scores.items():
+                key = self._key(board)
+                if score > 0:
+                    pipe.zadd(key, {user_id: score})
+                else:
+                    pipe.zrem(key, user_id)
+                pipe.incr(f"{key}:version")
+            await pipe.execute()
+
+    async def top(self, board: str, count: int) -> list[tuple[int, str, int]]:
+        return await self._entries(self._key(board), 0, count - 1)
+
+    async def rank(self, board: str, user_id: int) -> int:
+        key = self._key(board)
+        score = await self._redis.zscore(key, user_id) or 0
+        return await self._redis.zcount(key, f"({score}", "+inf") + 1
+
+    async def _entries(self, key: str, start: int, stop: int) -> list[tuple]:
+        if stop < start:
+            return []
+        entries = await self._redis.zrevrange(key, start, stop, withscores=True)
+        if not entries:
+            return []
+        names = await self._redis.hmget(self.NAMES_KEY, [m for m, _ in entries])
+        return [
+            (int(member), name or "", int(score))
+            for (member, score), name in zip(entries, names)
+        ]
+
+    async def page(
+        self, board: str, count: int, after: tuple[int, int] | None = None
+    ) -> list[tuple[int, str, int]]:
+        key = self._key(board)
+        start = 0
+        if after:
+            pos = await self._redis.zrevrank(key, after[1])
+            if pos is None:
+                # The cursor user left the board; resume below their score.
+                start = await self._redis.zcount(key, f"({after[0]}", "+inf")
+            else:
+                start = pos + 1
+        return await self._entries(key, start, start + count - 1)
+
+    async def window(
+        self, board: str, user_id: int, radius: int
+    ) -> list[tuple[int, int, str, int]]:
+        key = self._key(board)
+        pos = await self._redis.zrevrank(key, user_id)
+        if pos is None:
+            pos = await self._redis.zcard(key)
+        entries = await self._entries(key, max(pos - radius, 0), pos + radius)
+
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for _, _, score in entries:
+                pipe.zcount(key, f"({score}", "+inf")
+            counts = await pipe.execute()
+        return [
+            (count + 1, uid, name, score)
+            for count, (uid, name, score) in zip(counts, entries)
+        ]
+
+    async def reset(self, board: str) -> None:
+        key = self._key(board)
+        await self._redis.delete(key)
+        await self._redis.incr(f"{key}:version")
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+    def info(self) -> dict:
+        return {"backend": "redis"}
+
+
+def create_leaderboards(url: str | None) -> Leaderboards:
+    if not url:
+        return SqlLeaderboards()
+    if url.startswith("memory://"):
+        return MemoryLeaderboards()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisLeaderboards(url)
+    raise ValueError(f"Unsupported LEADERBOARD_URL: {url}")
+
+
+leaderboards = create_leaderboards(config.LEADERBOARD_URL)
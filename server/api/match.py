@@ -1,8 +1,8 @@
+import json
+from functools import partial
 from typing import List
 from datetime import datetime, timezone
 from math import ceil
-from random import shuffle, sample
-from fuzzywuzzy import process
 from db import (
     Flag,
     Match,
@@ -12,12 +12,31 @@ from db import (
     UserAchievement,
 )
 from fastapi import APIRouter, Depends, HTTPException, Query, Body
+from tortoise import BaseDBAsyncClient, connections
+from tortoise.transactions import in_transaction
 from fastapi.responses import JSONResponse
 from aiogram.utils.web_app import WebAppInitData
-from .utils import auth, check_user, answer_map
+from .utils import auth, check_user
+from .answer_matching import answer_index
+from .flag_catalog import NUM_OPTIONS, FlagCatalog, get_flag_catalog
+from .flag_stats import flag_stats
+from .leaderboard import add_today_score, leaderboards
+from .match_store import MatchState, match_store, track_match
+from .question_pool import question_pool
 
 router = APIRouter(prefix="/api/games", dependencies=[Depends(auth)])
 
+RECORD_ANSWER_SQL = """
+UPDATE "match"
+SET "current_question_idx" = $2,
+    "current_question_started_at" = $3,
+    "completed_at" = $4,
+    "base_score" = $5,
+    "score" = $6,
+    "journal" = "journal" || $7::jsonb
+WHERE "id" = $1
+"""
+
 
 @router.post("/casual/start")
 async def casual_start(
@@ -26,12 +45,15 @@ async def casual_start(
     gamemode: str = Query(None),
     auth_data: WebAppInitData = Depends(auth),
 ) -> JSONResponse:
-    user = await check_user(auth_data.user.id)
+    user = await check_user(auth_data.user.id, fresh=True)
 
     if user.tries_left <= 0:
         raise HTTPException(status_code=403, detail="No tries left")
 
-    question_list = await create_casual_questions(num_questions, category, gamemode)
+    question_list = await question_pool.take(
+        ("casual", category, gamemode, num_questions),
+        partial(create_casual_questions, num_questions, category, gamemode),
+    )
     difficulty_multiplier = 1
 
     if gamemode == "enter":
@@ -50,6 +72,8 @@ async def casual_start(
         difficulty_multiplier=difficulty_multiplier,
         base_score=0,
     )
+    await track_match(match)
+    first_question = match_question(await get_flag_catalog(), match, 0)
 
     user.casual_games_played += 1
     await user.save()
@@ -60,10 +84,10 @@ async def casual_start(
             "num_questions": num_questions,
             "current_question": {
                 "index": 0,
-                "flag_id": question_list[0]["flag_id"],
-                "image": question_list[0]["image"],
-                "options": question_list[0]["options"],
-                "mode": question_list[0]["mode"],
+                "flag_id": first_question["flag_id"],
+                "image": first_question["image"],
+                "options": first_question["options"],
+                "mode": first_question["mode"],
             },
         }
     )
@@ -71,69 +95,42 @@ async def casual_start(
 
 async def create_casual_questions(
     num_questions: int, category: str, gamemode: str
-) -> List[dict]:
+) -> List[list[int]]:
     list_length = int(num_questions)
+    catalog = await get_flag_catalog()
     if category == "cis":
-        all_flags = await Flag.filter(
-            category__in=["ru_regions", "ua_regions", "by_regions"]
-        )
+        sampler = catalog.sampler(["ru_regions", "ua_regions", "by_regions"])
     elif category and category != "frenzy":
-        all_flags = await Flag.filter(category=category)
+        sampler = catalog.sampler([category])
     else:
-        all_flags = await Flag.all()
+        sampler = catalog.sampler()
 
-    if len(all_flags) < list_length:
+    if len(sampler) < list_length:
         raise HTTPException(
             status_code=400, detail="Not enough flags to create questions"
         )
+    if len(sampler) < NUM_OPTIONS:
+        raise HTTPException(status_code=400, detail="Not enough flags for options")
 
-    
-    easy_flags = [f for f in all_flags if f.difficulty <= 0.33]
-    medium_flags = [f for f in all_flags if 0.34 <= f.difficulty <= 0.66]
-    hard_flags = [f for f in all_flags if f.difficulty > 0.66]
+    flags = sampler.draw_balanced(list_length)
+    return [sampler.encode_question(flag) for flag in flags]
 
-    
-    num_easy = ceil(list_length * 0.33)
-    num_medium = ceil(list_length * 0.33)
-    num_hard = list_length - num_easy - num_medium  
 
-    def sample_flags(pool, count):
-        if len(pool) >= count:
-            return sample(pool, count)
-        else:
-            
-            needed = count - len(pool)
-            extra = sample([f for f in all_flags if f not in pool], needed)
-            return pool + extra
-
-    selected_flags = []
-    selected_flags += sample_flags(easy_flags, num_easy)
-    selected_flags += sample_flags(medium_flags, num_medium)
-    selected_flags += sample_flags(hard_flags, num_hard)
-
-    shuffle(selected_flags)
-
-    
-    questions = []
-    for flag in selected_flags:
-        incorrect_pool = [f for f in all_flags if f.id != flag.id]
-        if len(incorrect_pool) < 6:
-            raise HTTPException(status_code=400, detail="Not enough flags for options")
-        incorrect_options = sample(incorrect_pool, 6)
-        options = [f.name for f in incorrect_options] + [flag.name]
-        shuffle(options)
-
-        questions.append(
-            {
-                "flag_id": flag.id,
-                "image": flag.image,
-                "options": options,
-                "mode": gamemode,
-                "answer": flag.name,
-                "difficulty": flag.difficulty,
-            }
-        )
-    return questions
+def match_question(catalog: FlagCatalog, match: Match | MatchState, idx: int) -> dict:
+    """The ``idx``-th question of ``match`` with names and images filled in."""
+    return catalog.decode_question(
+        match.questions[idx],
+        match.gamemode,
+        scored=match.match_type != "tournament",
+    )
+
+
+def question_candidates(question: dict) -> list[str]:
+    """Names a write-in answer for ``question`` is resolved against first."""
+    options = question.get("options") or []
+    if question["answer"] in options:
+        return options
+    return [question["answer"], *options]
 
 
 @router.get("/match/active")
@@ -146,30 +143,31 @@ async def get_match(
     if not match:
         return JSONResponse({"status": "Match not found!"})
 
-    
-    if match.current_question_started_at:
-        elapsed = datetime.now(timezone.utc) - match.current_question_started_at
+    state = None
+    if match_store is not None:
+        state = await match_store.get(match.id)
+    if state is None:
+        state = MatchState.from_match(match)
+
+    catalog = await get_flag_catalog()
+
+    if state.current_question_started_at:
+        elapsed = datetime.now(timezone.utc) - state.current_question_started_at
         if elapsed.total_seconds() > 15:
-            await MatchAnswer.create(
-                match=match,
-                question_idx=match.current_question_idx,
-                flag_id=match.questions[match.current_question_idx]["flag_id"],
-                user_answer="Time expired",
-                is_correct=False,
+            question_idx = state.current_question_idx
+            question = match_question(catalog, state, question_idx)
+            apply_answer(state, "time expired", question)
+            await persist_answer(
+                state, question_idx, question["flag_id"], "Time expired", False, 0
             )
-            match.current_question_idx += 1
-            if match.current_question_idx >= match.num_questions:
-                match.completed_at = datetime.now(timezone.utc)
-                await complete_match(match, user)
-                await match.save()
+
+            if state.completed_at:
+                user = await check_user(user.id, fresh=True)
+                await finish_match(state, user, match)
                 return JSONResponse({"status": "Time expired. Match completed."})
-            else:
-                match.current_question_started_at = datetime.now(timezone.utc)
-                await match.save()
 
-    
-    idx = match.current_question_idx
-    question = match.questions[idx]
+    idx = state.current_question_idx
+    question = match_question(catalog, state, idx)
 
     return JSONResponse(
         {
@@ -191,138 +189,211 @@ async def answer(
     auth_data: WebAppInitData = Depends(auth),
     payload: dict = Body(...),
 ) -> JSONResponse:
-    user = await check_user(auth_data.user.id)
-    user_id = user.id
-
     submitted_answer = payload.get("answer")
     if submitted_answer is None:
         raise HTTPException(status_code=400, detail="Missing answer")
     if not submitted_answer.strip():
         raise HTTPException(status_code=400, detail="Empty answer")
 
-    submitted_answer_raw = submitted_answer.strip().lower()
-    normalized_answer = answer_map.get(submitted_answer_raw)
+    if match_store is None:
+        async with in_transaction() as conn:
+            match = (
+                await Match.select_for_update()
+                .using_db(conn)
+                .filter(id=match_id, user_id=auth_data.user.id)
+                .first()
+            )
+            if not match:
+                raise HTTPException(status_code=404, detail="Match not found")
+            state = MatchState.from_match(match)
+            is_correct, correct_answer = await submit_answer(
+                state, submitted_answer, auth_data.user.id, conn, match
+            )
+    else:
+        state = await match_store.get(match_id)
+        if state is None:
+            match = await Match.filter(id=match_id, user_id=auth_data.user.id).first()
+            if not match:
+                raise HTTPException(status_code=404, detail="Match not found")
+            state = MatchState.from_match(match)
+        elif state.user_id != auth_data.user.id:
+            raise HTTPException(status_code=404, detail="Match not found")
+        is_correct, correct_answer = await submit_answer(
+            state, submitted_answer, auth_data.user.id
+        )
 
-    
-    if normalized_answer is None:
-        best_match, score = process.extractOne(submitted_answer_raw, answer_map.keys())
-        if score >= 80:  
-            normalized_answer = answer_map[best_match]
-        else:
-            normalized_answer = submitted_answer_raw
+    if state.completed_at:
+        return JSONResponse(
+            {
+                "correct": is_correct,
+                "correct_answer": correct_answer,
+                "finished": True,
+                "current_question": None,
+                "score": state.score,
+            }
+        )
 
-    
-    match = await Match.filter(id=match_id, user_id=user_id).first()
-    if not match:
-        raise HTTPException(status_code=404, detail="Match not found")
-    if match.completed_at:
+    catalog = await get_flag_catalog()
+    next_q = match_question(catalog, state, state.current_question_idx)
+    return JSONResponse(
+        {
+            "correct": is_correct,
+            "correct_answer": correct_answer,
+            "finished": False,
+            "current_question": {
+                "index": state.current_question_idx,
+                "image": next_q["image"],
+                "options": next_q["options"],
+                "mode": next_q["mode"],
+            },
+            "score": state.score,
+        }
+    )
+
+
+async def submit_answer(
+    state: MatchState,
+    submitted_answer: str,
+    user_id: int,
+    using_db: BaseDBAsyncClient | None = None,
+    match: Match | None = None,
+) -> tuple[bool, str]:
+    """Score, persist and, on the last question, complete the match.
+
+    Returns whether the answer was correct and the expected answer.
+    """
+    if state.completed_at:
         raise HTTPException(status_code=400, detail="Match already completed")
 
-    question = match.questions[match.current_question_idx]
+    catalog = await get_flag_catalog()
+    question_idx = state.current_question_idx
+    question = match_question(catalog, state, question_idx)
     correct_answer = question["answer"].strip().lower()
 
-    
-    elapsed = None
-    if match.current_question_started_at:
-        elapsed = datetime.now(timezone.utc) - match.current_question_started_at
-
-    
-    if (elapsed and elapsed.total_seconds() > 15) or submitted_answer == "time expired":
-        await MatchAnswer.create(
-            match=match,
-            question_idx=match.current_question_idx,
-            flag_id=question["flag_id"],
-            user_answer="Time expired",
-            is_correct=False,
-        )
+    user_answer, is_correct, expired, points = apply_answer(
+        state, submitted_answer, question
+    )
+    await persist_answer(
+        state,
+        question_idx,
+        question["flag_id"],
+        user_answer,
+        is_correct,
+        points,
+        using_db,
+    )
 
-        match.current_question_idx += 1
-
-        if match.current_question_idx >= match.num_questions:
-            match.completed_at = datetime.now(timezone.utc)
-            await complete_match(match, user)
-            await match.save()
-            return JSONResponse(
-                {
-                    "correct": False,
-                    "correct_answer": correct_answer,
-                    "finished": True,
-                    "current_question": None,
-                    "score": match.score,
-                }
-            )
-        else:
-            match.current_question_started_at = datetime.now(timezone.utc)
-            await match.save()
-            next_q = match.questions[match.current_question_idx]
-            return JSONResponse(
-                {
-                    "correct": False,
-                    "correct_answer": correct_answer,
-                    "finished": False,
-                    "current_question": {
-                        "index": match.current_question_idx,
-                        "image": next_q["image"],
-                        "options": next_q["options"],
-                        "mode": next_q["mode"],
-                    },
-                    "score": match.score,
-                }
-            )
+    if state.completed_at:
+        user = await check_user(user_id, fresh=True)
+        await finish_match(state, user, match)
 
-    is_correct = normalized_answer.strip().lower() == correct_answer.strip().lower()
+    if not expired:
+        flag_stats.record(question["flag_id"], is_correct)
+    return is_correct, correct_answer
 
-    await MatchAnswer.create(
-        match=match,
-        question_idx=match.current_question_idx,
-        flag_id=question["flag_id"],
-        user_answer=submitted_answer,
-        is_correct=is_correct,
-    )
-    await update_flag_stats(question["flag_id"], is_correct)
 
-    if is_correct:
-        difficulty = question.get("difficulty", 0.33)
-        points = max(1, ceil(difficulty * 3))
-    else:
-        points = 0
+def apply_answer(
+    state: MatchState, submitted_answer: str, question: dict
+) -> tuple[str, bool, bool, int]:
+    """Score ``submitted_answer`` for the current ``question`` and advance ``state``.
 
-    match.base_score += points
-    match.score = round(match.base_score * match.difficulty_multiplier)
+    Returns the answer text to record, whether it was correct, whether the
+    question timer had run out and the points awarded.
+    """
+    correct_answer = question["answer"].strip().lower()
+    now = datetime.now(timezone.utc)
 
-    match.current_question_idx += 1
+    expired = submitted_answer == "time expired"
+    if state.current_question_started_at:
+        elapsed = now - state.current_question_started_at
+        expired = expired or elapsed.total_seconds() > 15
 
-    if match.current_question_idx >= match.num_questions:
-        match.completed_at = datetime.now(timezone.utc)
-        await complete_match(match, user)
-        await match.save()
-        return JSONResponse(
-            {
-                "correct": is_correct,
-                "correct_answer": correct_answer,
-                "finished": True,
-                "current_question": None,
-                "score": match.score,
-            }
+    points = 0
+    if expired:
+        user_answer = "Time expired"
+        is_correct = False
+    else:
+        normalized_answer = answer_index.resolve(
+            submitted_answer.strip().lower(), question_candidates(question)
         )
+        user_answer = submitted_answer
+        # A deleted flag decodes with an empty answer that nothing matches.
+        is_correct = (
+            bool(correct_answer)
+            and normalized_answer.strip().lower() == correct_answer
+        )
+
+        if is_correct:
+            difficulty = question.get("difficulty", 0.33)
+            points = max(1, ceil(difficulty * 3))
+
+        state.base_score += points
+        state.score = round(state.base_score * state.difficulty_multiplier)
+
+    state.current_question_idx += 1
+    if state.current_question_idx >= state.num_questions:
+        state.completed_at = now
     else:
-        match.current_question_started_at = datetime.now(timezone.utc)
-        await match.save()
-        next_q = match.questions[match.current_question_idx]
-        return JSONResponse(
-            {
-                "correct": is_correct,
-                "correct_answer": correct_answer,
-                "finished": False,
-                "current_question": {
-                    "index": match.current_question_idx,
-                    "image": next_q["image"],
-                    "options": next_q["options"],
-                    "mode": next_q["mode"],
-                },
-                "score": match.score,
-            }
+        state.current_question_started_at = now
+    return user_answer, is_correct, expired, points
+
+
+async def persist_answer(
+    state: MatchState,
+    question_idx: int,
+    flag_id: int,
+    user_answer: str,
+    is_correct: bool,
+    points: int,
+    using_db: BaseDBAsyncClient | None = None,
+) -> None:
+    """Append the answer to the match journal and save the new progress.
+
+    Without a hot store the progress and the journal entry go to the
+    ``match`` row in one statement; with one, nothing touches Postgres until
+    the match completes.
+    """
+    entry = {
+        "question_idx": question_idx,
+        "flag_id": flag_id,
+        "user_answer": user_answer,
+        "is_correct": is_correct,
+        "points": points,
+        "answered_at": datetime.now(timezone.utc).isoformat(),
+    }
+    state.journal.append(entry)
+
+    if match_store is None:
+        db = using_db or connections.get("default")
+        await db.execute_query(
+            RECORD_ANSWER_SQL,
+            [
+                state.match_id,
+                state.current_question_idx,
+                state.current_question_started_at,
+                state.completed_at,
+                state.base_score,
+                state.score,
+                json.dumps([entry]),
+            ],
         )
+        return
+
+    expected_version = state.version
+    state.version += 1
+    if not await match_store.save(state, expected_version):
+        raise HTTPException(status_code=409, detail="Answer already submitted")
+
+
+async def finish_match(state: MatchState, user, match: Match | None = None) -> bool:
+    """Write the final state to the ``match`` row and complete it."""
+    if match is None:
+        match = await Match.get(id=state.match_id)
+    state.apply_to(match)
+    returned_attempt = await complete_match(match, user)
+    if match_store is not None:
+        await match_store.delete(state.match_id)
+    return returned_attempt
 
 
 @router.get("/match/{match_id}/summary")
@@ -345,11 +416,16 @@ async def get_summary(
             "flag_id",
             "user_answer",
             "is_correct",
+            "points",
             "answered_at",
         )
     )
 
-    question_lookup = {idx: q for idx, q in enumerate(match.questions)}
+    catalog = await get_flag_catalog()
+    question_lookup = {
+        idx: match_question(catalog, match, idx)
+        for idx in range(len(match.questions))
+    }
 
     enriched_answers = []
     for a in answers:
@@ -357,8 +433,12 @@ async def get_summary(
         if not q:
             continue
 
-        difficulty = q.get("difficulty", 0.33)
-        points = max(1, ceil(difficulty * 3)) if a["is_correct"] else 0
+        # Answers recorded before points were stored fall back to the
+        # current difficulty of the flag.
+        points = a["points"]
+        if points is None:
+            difficulty = q.get("difficulty", 0.33)
+            points = max(1, ceil(difficulty * 3)) if a["is_correct"] else 0
 
         enriched_answers.append(
             {
@@ -377,7 +457,7 @@ async def get_summary(
     max_mistakes = {10: 0, 15: 1, 20: 2}.get(total_questions, 0)
     wrong_answers_count = sum(1 for a in enriched_answers if not a["is_correct"])
 
-    
+
     if len(enriched_answers) == total_questions and wrong_answers_count <= max_mistakes:
         returned_attempt = True
     else:
@@ -401,14 +481,17 @@ async def get_summary(
 async def submit_casual_match(
     match_id: str, auth_data: WebAppInitData = Depends(auth)
 ) -> JSONResponse:
-    user = await check_user(auth_data.user.id)
+    user = await check_user(auth_data.user.id, fresh=True)
     match = await Match.filter(id=match_id, user_id=user.id).first()
     if not match:
         raise HTTPException(404, "Match not found")
     if match.completed_at:
         raise HTTPException(400, "Match already completed")
 
-    await complete_match(match, user)
+    state = None
+    if match_store is not None:
+        state = await match_store.get(match.id)
+    await finish_match(state or MatchState.from_match(match), user, match)
     await check_achievements(user, match)
     return JSONResponse({"message": "Match submitted successfully"})
 
@@ -421,22 +504,44 @@ async def complete_match(match: Match, user) -> bool:
 
     returned_attempt = False
 
+    # Answers are journaled on the match while it runs and written out here.
+    journal = match.journal
+    results = [a["is_correct"] for a in journal]
+    if len(journal) < match.current_question_idx:
+        # Matches started before the journal already have rows for their
+        # first answers.
+        results += await MatchAnswer.filter(match_id=match.id).values_list(
+            "is_correct", flat=True
+        )
+    await MatchAnswer.bulk_create(
+        [
+            MatchAnswer(
+                match_id=match.id,
+                question_idx=a["question_idx"],
+                flag_id=a["flag_id"],
+                user_answer=a["user_answer"],
+                is_correct=a["is_correct"],
+                points=a.get("points"),
+                answered_at=datetime.fromisoformat(a["answered_at"]),
+            )
+            for a in journal
+        ]
+    )
+    match.journal = []
+
     if match.match_type == "tournament" and match.participant_id:
         participant = await TournamentParticipant.get(id=match.participant_id)
         participant.score += match.score
         await participant.save()
     else:
         user.casual_score += match.score
-        user.today_casual_score += match.score
+        add_today_score(user, match.score)
 
         total_questions = match.num_questions
         max_mistakes = {10: 0, 15: 1, 20: 2}.get(total_questions, 0)
 
-        wrong_answers_count = await MatchAnswer.filter(
-            match_id=match.id, is_correct=False
-        ).count()
-
-        answered_count = await MatchAnswer.filter(match_id=match.id).count()
+        wrong_answers_count = results.count(False)
+        answered_count = len(results)
 
         if answered_count >= total_questions:
             if wrong_answers_count > max_mistakes:
@@ -449,6 +554,7 @@ async def complete_match(match: Match, user) -> bool:
             returned_attempt = False
 
         await user.save()
+        await leaderboards.record(user)
 
     await match.save()
     return returned_attempt
@@ -469,13 +575,3 @@ async def check_achievements(user, match):
             already = await UserAchievement.filter(user=user, achievement=ach).exists()
             if not already:
                 await UserAchievement.create(user=user, achievement=ach)
-
-
-async def update_flag_stats(flag_id: int, is_correct: bool):
-    flag = await Flag.get(id=flag_id)
-    flag.total_shown += 1
-    if is_correct:
-        flag.total_correct += 1
-    if flag.total_shown > 0:
-        flag.difficulty = 1 - (flag.total_correct / flag.total_shown)
-    await flag.save()
@@ -0,0 +1,178 @@
+"""Hot storage for the state of in-progress matches.
+
+``MATCH_STORE_URL`` selects the backend:
+
+* unset - no hot store, progress is written to the ``match`` row on every
+  answer (safe for any number of workers);
+* ``memory://`` - a process-local dict, only for single-process deployments
+  and tests;
+* ``redis://...`` - any Redis-protocol server, shared by all workers.
+
+With a hot store the ``match`` row is written at creation and completion
+only, and the answer journal lives in the store until then. Saves are
+compare-and-set on ``MatchState.version`` so a double tap cannot answer the
+same question twice.
+"""
+
+from datetime import datetime
+from time import monotonic
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from config_reader import config
+from db import Match
+
+STATE_TTL = 2 * 60 * 60
+
+
+class MatchState(BaseModel):
+    match_id: UUID
+    user_id: int
+    questions: list[list[int] | dict]
+    num_questions: int
+    gamemode: str | None = None
+    match_type: str = "casual"
+    current_question_idx: int = 0
+    current_question_started_at: datetime | None = None
+    completed_at: datetime | None = None
+    base_score: int = 0
+    score: int = 0
+    difficulty_multiplier: float = 1.0
+    journal: list[dict] = []
+    version: int = 0
+
+    @classmethod
+    def from_match(cls, match: Match) -> "MatchState":
+        return cls(
+            match_id=match.id,
+            user_id=match.user_id,
+            questions=match.questions,
+            num_questions=match.num_questions,
+            gamemode=match.gamemode,
+            match_type=match.match_type,
+            current_question_idx=match.current_question_idx,
+            current_question_started_at=match.current_question_started_at,
+            completed_at=match.completed_at,
+            base_score=match.base_score,
+            score=match.score,
+            difficulty_multiplier=match.difficulty_multiplier,
+            journal=match.journal,
+        )
+
+    def apply_to(self, match: Match) -> None:
+        match.current_question_idx = self.current_question_idx
+        match.current_question_started_at = self.current_question_started_at
+        match.completed_at = self.completed_at
+        match.base_score = self.base_score
+        match.score = self.score
+        match.journal = self.journal
+
+
+class MemoryMatchStore:
+    def __init__(self, ttl: int = STATE_TTL):
+        self.ttl = ttl
+        self._states: dict[str, tuple[float, MatchState]] = {}
+
+    async def get(self, match_id) -> MatchState | None:
+        entry = self._states.get(str(match_id))
+        if entry is None:
+            return None
+        expires_at, state = entry
+        if expires_at < monotonic():
+            del self._states[str(match_id)]
+            return None
+        # Deep copies: a request appends to its state's journal before the
+        # compare-and-set, which must not touch the stored one.
+        return state.model_copy(deep=True)
+
+    async def save(
+        self, state: MatchState, expected_version: int | None = None
+    ) -> bool:
+        key = str(state.match_id)
+        current = self._states.get(key)
+        if (
+            expected_version is not None
+            and current is not None
+            and current[1].version != expected_version
+        ):
+            return False
+        self._states[key] = (monotonic() + self.ttl, state.model_copy(deep=True))
+        return True
+
+    async def delete(self, match_id) -> None:
+        self._states.pop(str(match_id), None)
+
+    async def close(self) -> None:
+        self._states.clear()
+
+
+# KEYS[1] = state key; ARGV = expected version ("" to skip), new version,
+# state JSON, ttl.
+_SAVE_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'version')
+if ARGV[1] ~= '' and current and current ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'version', ARGV[2], 'state', ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+
+class RedisMatchStore:
+    def __init__(self, url: str, ttl: int = STATE_TTL):
+        from redis.asyncio import Redis
+
+        self.ttl = ttl
+        self._redis = Redis.from_url(url)
+        self._save = self._redis.register_script(_SAVE_SCRIPT)
+
+    @staticmethod
+    def _key(match_id) -> str:
+        return f"match:{match_id}"
+
+    async def get(self, match_id) -> MatchState | None:
+        raw = await self._redis.hget(self._key(match_id), "state")
+        if raw is None:
+            return None
+        return MatchState.model_validate_json(raw)
+
+    async def save(
+        self, state: MatchState, expected_version: int | None = None
+    ) -> bool:
+        saved = await self._save(
+            keys=[self._key(state.match_id)],
+            args=[
+                "" if expected_version is None else expected_version,
+                state.version,
+                state.model_dump_json(),
+                self.ttl,
+            ],
+        )
+        return bool(saved)
+
+    async def delete(self, match_id) -> None:
+        await self._redis.delete(self._key(match_id))
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def create_match_store(url: str | None):
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return MemoryMatchStore()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisMatchStore(url)
+    raise ValueError(f"Unsupported MATCH_STORE_URL: {url}")
+
+
+match_store = create_match_store(config.MATCH_STORE_URL)
+
+
+async def track_match(match: Match) -> None:
+    """Put a freshly created match into the hot store, if there is one."""
+    if match_store is not None:
+        await match_store.save(MatchState.from_match(match))
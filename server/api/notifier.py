@@ -0,0 +1,121 @@
+"""Rate-limited fan-out of bot messages to many chats.
+
+Messages are sent by a small pool of workers that share one limiter: at most
+``GLOBAL_RATE`` messages per second overall and one message per
+``CHAT_INTERVAL`` seconds to the same chat. A ``TelegramRetryAfter`` pauses
+every worker for the requested time before the message is retried.
+
+Callers collect their messages first and send them after committing, so no
+database transaction waits on Telegram.
+"""
+
+import asyncio
+import logging
+from dataclasses import asdict, dataclass
+from time import monotonic
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+
+from config_reader import bot
+
+logger = logging.getLogger(__name__)
+
+# A little under Telegram's limit of about 30 messages per second.
+GLOBAL_RATE = 28
+CHAT_INTERVAL = 1.0
+WORKERS = 8
+MAX_RETRIES = 3
+
+
+@dataclass
+class NotifyStats:
+    total: int = 0
+    sent: int = 0
+    failed: int = 0
+    retried: int = 0
+    elapsed: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"📨 Notified {self.sent}/{self.total}, failed {self.failed}, "
+            f"retried {self.retried} in {self.elapsed:.1f} s"
+        )
+
+
+class Notifier:
+    def __init__(
+        self,
+        bot: Bot,
+        rate: float = GLOBAL_RATE,
+        chat_interval: float = CHAT_INTERVAL,
+        workers: int = WORKERS,
+    ):
+        self.bot = bot
+        self.rate = rate
+        self.chat_interval = chat_interval
+        self.workers = workers
+        self.totals = NotifyStats()
+        self._next_slot = 0.0
+        self._chat_next: dict[int, float] = {}
+
+    async def _wait_turn(self, chat_id: int) -> None:
+        now = monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + 1 / self.rate
+        slot = max(slot, self._chat_next.get(chat_id, 0.0))
+        self._chat_next[chat_id] = slot + self.chat_interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def _send(self, chat_id: int, text: str, stats: NotifyStats) -> None:
+        for _ in range(MAX_RETRIES + 1):
+            await self._wait_turn(chat_id)
+            try:
+                await self.bot.send_message(chat_id=chat_id, text=text)
+            except TelegramRetryAfter as e:
+                stats.retried += 1
+                self._next_slot = max(self._next_slot, monotonic() + e.retry_after)
+                logger.warning("Rate limited, retrying in %s s", e.retry_after)
+                continue
+            except Exception as e:
+                stats.failed += 1
+                logger.warning("Failed to send message to %s: %s", chat_id, e)
+                return
+            stats.sent += 1
+            return
+        stats.failed += 1
+        logger.warning("Gave up sending message to %s", chat_id)
+
+    async def send_all(self, messages: list[tuple[int, str]]) -> NotifyStats:
+        """Send ``(chat_id, text)`` messages and wait until all are done."""
+        stats = NotifyStats(total=len(messages))
+        started = monotonic()
+        queue: asyncio.Queue[tuple[int, str]] = asyncio.Queue()
+        for message in messages:
+            queue.put_nowait(message)
+
+        async def worker() -> None:
+            while not queue.empty():
+                chat_id, text = queue.get_nowait()
+                await self._send(chat_id, text, stats)
+
+        await asyncio.gather(
+            *(worker() for _ in range(min(self.workers, len(messages))))
+        )
+
+        stats.elapsed = monotonic() - started
+        now = monotonic()
+        self._chat_next = {c: t for c, t in self._chat_next.items() if t > now}
+        self.totals.total += stats.total
+        self.totals.sent += stats.sent
+        self.totals.failed += stats.failed
+        self.totals.retried += stats.retried
+        self.totals.elapsed += stats.elapsed
+        return stats
+
+    def info(self) -> dict:
+        return asdict(self.totals)
+
+
+notifier = Notifier(bot)
@@ -0,0 +1,124 @@
+"""Ready-made question sets for match start.
+
+Every (generator, category, gamemode, num_questions, tags) combination that
+has been requested gets a ring buffer of prepared question lists. Match
+start pops one in O(1); a background task refills the buffers. When a
+buffer is empty the set is generated inline and counted as exhausted. A
+combination gets its buffer only once a set was generated for it, so
+requests the generator rejects never reach the refill task.
+
+Question sets are lists of encoded questions (see
+:meth:`api.flag_catalog.FlagCatalog.encode_question`).
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Hashable
+
+from fastapi import HTTPException
+
+from config_reader import config
+from .flag_catalog import catalog_version
+
+logger = logging.getLogger(__name__)
+
+MAX_POOLS = 64
+
+QuestionFactory = Callable[[], Awaitable[list[list[int]]]]
+
+
+class QuestionPool:
+    def __init__(self, depth: int, max_pools: int = MAX_POOLS):
+        self.depth = depth
+        self.max_pools = max_pools
+        self.hits = 0
+        self.exhausted = 0
+        self.produced = 0
+        self._pools: OrderedDict[Hashable, deque] = OrderedDict()
+        self._factories: dict[Hashable, QuestionFactory] = {}
+        self._wanted = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    async def take(
+        self, key: Hashable, factory: QuestionFactory
+    ) -> list[list[int]]:
+        """A prepared question set for ``key``, or a fresh one from ``factory``."""
+        pool = self._pools.get(key)
+        if pool is not None:
+            self._pools.move_to_end(key)
+            version = catalog_version()
+            while pool:
+                pool_version, questions = pool.popleft()
+                if pool_version == version:
+                    self.hits += 1
+                    self._wanted.set()
+                    return questions
+
+        questions = await factory()
+        self.exhausted += 1
+        if pool is None:
+            self._register(key, factory)
+        self._wanted.set()
+        return questions
+
+    def _register(self, key: Hashable, factory: QuestionFactory) -> None:
+        self._pools[key] = deque(maxlen=self.depth)
+        self._factories[key] = factory
+        while len(self._pools) > self.max_pools:
+            evicted, _ = self._pools.popitem(last=False)
+            self._factories.pop(evicted, None)
+
+    async def _refill(self) -> None:
+        for key, pool in list(self._pools.items()):
+            factory = self._factories.get(key)
+            while factory and len(pool) < self.depth and key in self._pools:
+                version = catalog_version()
+                try:
+                    questions = await factory()
+                except Exception as e:
+                    # The generator rejects requests with HTTPException, e.g.
+                    # when too few flags are left; that needs no traceback.
+                    if isinstance(e, HTTPException):
+                        logger.warning("Dropping question pool %s: %s", key, e.detail)
+                    else:
+                        logger.exception("Dropping question pool %s", key)
+                    self._pools.pop(key, None)
+                    self._factories.pop(key, None)
+                    break
+                pool.append((version, questions))
+                self.produced += 1
+                # Let request handlers run between sets.
+                await asyncio.sleep(0)
+
+    async def run(self) -> None:
+        while True:
+            await self._wanted.wait()
+            self._wanted.clear()
+            await self._refill()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def info(self) -> dict:
+        return {
+            "hits": self.hits,
+            "exhausted": self.exhausted,
+            "produced": self.produced,
+            "pools": len(self._pools),
+            "ready": sum(len(pool) for pool in self._pools.values()),
+            "depth": self.depth,
+        }
+
+
+question_pool = QuestionPool(config.QUESTION_POOL_DEPTH)
@@ -0,0 +1,227 @@
+"""Cron-style scheduler for the periodic jobs of :mod:`api.cronjobs`.
+
+Every app worker (or ``run_cron.py --serve``) runs the scheduler.
+When a job is due, the first process to insert its ``(name, scheduled_at)``
+row into ``job_runs`` claims the run. The job then executes under a
+Postgres advisory lock on its name, so a slow run never overlaps the next
+one. Each row records the run's duration and outcome.
+
+One-shot runs (``run_cron.py`` from system cron) claim the job's latest
+scheduled tick instead of the current minute, so a crontab entry that
+fires at another minute than the schedule still shares the row of the
+in-app run and does not run the job a second time for the same tick.
+
+Schedules use the five cron fields (minute, hour, day of month, month,
+day of week) in the server's local time. Runs missed while no process was
+up are not replayed.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+from typing import Awaitable, Callable
+
+from tortoise import connections
+
+from db import JobRun
+
+from . import cronjobs
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for one sleep, so a changed wall clock is noticed.
+MAX_SLEEP = 60
+
+CLAIM_SQL = """
+INSERT INTO "job_runs" ("name", "scheduled_at", "started_at", "status")
+VALUES ($1, $2, now(), 'running')
+ON CONFLICT ("name", "scheduled_at") DO NOTHING
+RETURNING "id"
+"""
+
+
+class CronSchedule:
+    """A five-field cron expression such as ``"0 0 * * *"``.
+
+    Fields accept ``*``, numbers, ranges, lists and steps (``*/15``,
+    ``1-5``, ``0,30``). Sunday is ``0`` or ``7``.
+    """
+
+    RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Expected 5 cron fields: {expression!r}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse(field, low, high)
+            for field, (low, high) in zip(fields, self.RANGES)
+        )
+        self.weekdays = {day % 7 for day in weekdays}
+        # As in cron, a restricted day of month and day of week are OR'ed.
+        self._day_or_weekday = fields[2] != "*" and fields[4] != "*"
+
+    @staticmethod
+    def _parse(field: str, low: int, high: int) -> frozenset[int]:
+        values = set()
+        for part in field.split(","):
+            span, _, step = part.partition("/")
+            if span == "*":
+                start, end = low, high
+            elif "-" in span:
+                start, end = map(int, span.split("-"))
+            else:
+                start = int(span)
+                end = high if step else start
+            step = int(step) if step else 1
+            if not low <= start <= end <= high or step < 1:
+                raise ValueError(f"Invalid cron field: {field!r}")
+            values.update(range(start, end + 1, step))
+        return frozenset(values)
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        weekday = moment.isoweekday() % 7 in self.weekdays
+        return (day or weekday) if self._day_or_weekday else (day and weekday)
+
+    def next_after(self, moment: datetime) -> datetime:
+        """The first matching minute strictly after ``moment``."""
+        moment = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=5 * 366)
+        while moment < limit:
+            if moment.month not in self.months:
+                month = moment.month % 12 + 1
+                year = moment.year + (month == 1)
+                moment = moment.replace(
+                    year=year, month=month, day=1, hour=0, minute=0
+                )
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+    def last_at_or_before(self, moment: datetime) -> datetime:
+        """The latest matching minute at or before ``moment``."""
+        moment = moment.replace(second=0, microsecond=0)
+        span = timedelta(minutes=1)
+        tick = self.next_after(moment - span)
+        while tick > moment:
+            # Look further back until the window holds a matching minute.
+            span *= 2
+            tick = self.next_after(moment - span)
+        while (later := self.next_after(tick)) <= moment:
+            tick = later
+        return tick
+
+
+class Job:
+    def __init__(self, name: str, cron: str, func: Callable[[], Awaitable]):
+        self.name = name
+        self.schedule = CronSchedule(cron)
+        self.func = func
+
+
+class Scheduler:
+    def __init__(self):
+        self.jobs: list[Job] = []
+        self._task: asyncio.Task | None = None
+        self._running: set[asyncio.Task] = set()
+
+    def add(self, name: str, cron: str, func: Callable[[], Awaitable]) -> None:
+        self.jobs.append(Job(name, cron, func))
+
+    async def run_job(self, job: Job, scheduled_at: datetime) -> None:
+        """Run ``job`` for its ``scheduled_at`` tick unless another process has."""
+        db = connections.get("default")
+        _, rows = await db.execute_query(
+            CLAIM_SQL, [job.name, scheduled_at.astimezone(timezone.utc)]
+        )
+        if not rows:
+            logger.info("Job %s already ran for %s", job.name, scheduled_at)
+            return
+        run_id = rows[0]["id"]
+
+        async with db.acquire_connection() as conn:
+            if not await conn.fetchval(
+                "SELECT pg_try_advisory_lock(hashtext($1))", job.name
+            ):
+                logger.warning("Job %s is still running, skipped", job.name)
+                await JobRun.filter(id=run_id).update(
+                    status="skipped", finished_at=datetime.now(timezone.utc)
+                )
+                return
+
+            started = perf_counter()
+            status, error = "ok", None
+            try:
+                await job.func()
+            except Exception as e:
+                logger.exception("Job %s failed", job.name)
+                status, error = "failed", repr(e)
+            finally:
+                await conn.execute("SELECT pg_advisory_unlock(hashtext($1))", job.name)
+
+        duration = perf_counter() - started
+        await JobRun.filter(id=run_id).update(
+            status=status,
+            error=error,
+            duration=duration,
+            finished_at=datetime.now(timezone.utc),
+        )
+        logger.info("Job %s finished: %s in %.1f s", job.name, status, duration)
+
+    async def run(self) -> None:
+        now = datetime.now()
+        due = {job.name: job.schedule.next_after(now) for job in self.jobs}
+        while True:
+            next_at = min(due.values())
+            delay = (next_at - datetime.now()).total_seconds()
+            if delay > 0:
+                await asyncio.sleep(min(delay, MAX_SLEEP))
+                continue
+
+            for job in self.jobs:
+                if due[job.name] <= next_at:
+                    task = asyncio.create_task(self._run_logged(job, due[job.name]))
+                    self._running.add(task)
+                    task.add_done_callback(self._running.discard)
+                    due[job.name] = job.schedule.next_after(datetime.now())
+
+    async def _run_logged(self, job: Job, scheduled_at: datetime) -> None:
+        try:
+            await self.run_job(job, scheduled_at)
+        except Exception:
+            logger.exception("Could not run job %s", job.name)
+
+    def start(self) -> None:
+        if self._task is None and self.jobs:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Let running jobs finish so their history rows are completed.
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    def info(self) -> dict:
+        return {job.name: job.schedule.expression for job in self.jobs}
+
+
+scheduler = Scheduler()
+scheduler.add(
+    "reset_today_casual_score", "0 0 * * *", cronjobs.reset_today_casual_score
+)
+scheduler.add("end_season_if_needed", "1 0 * * *", cronjobs.end_season_if_needed)
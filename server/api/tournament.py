@@ -1,10 +1,10 @@
+import json
 from datetime import datetime, timedelta, timezone
-
-from random import sample, shuffle
+from functools import partial
 from typing import List
-from db import Tournament, TournamentParticipant, Match, Flag, Season, SeasonPrize
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from db import Tournament, TournamentParticipant, Match, Season, SeasonPrize
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, Response
 from aiogram.utils.web_app import WebAppInitData
 from aiogram.methods import CreateInvoiceLink
 from aiogram.types import (
@@ -12,6 +12,10 @@ from aiogram.types import (
 )
 from config_reader import bot
 from .utils import auth, check_user
+from .flag_catalog import NUM_OPTIONS, get_flag_catalog
+from .match_store import track_match
+from .question_pool import question_pool
+from .tournament_listing import tournament_listing
 
 router = APIRouter(prefix="/api/tournaments", dependencies=[Depends(auth)])
 
@@ -83,84 +87,40 @@ async def get_today_tournament() -> JSONResponse:
 
 
 @router.get("/all")
-async def get_all_tournaments() -> JSONResponse:
-    now = datetime.now(timezone.utc)
-
-    tournaments = (
-        await Tournament.all()
-        .filter(finished_at__isnull=True)
-        .order_by("-created_at")
-        .prefetch_related("participants__user", "prize_slots__prize")
-    )
-
-    active_tournaments = []
-    for t in tournaments:
-        if t.will_finish_at and t.will_finish_at < now:
-            t.finished_at = now
-            await t.save()
-        else:
-            active_tournaments.append(t)
-
-    if not active_tournaments:
+async def get_all_tournaments(
+    auth_data: WebAppInitData = Depends(auth),
+) -> Response:
+    # Overdue tournaments are closed by api.tournament_finisher; until then
+    # they are just left out. The listing is shared by all users, so the
+    # caller's tournaments are sent next to it.
+    body = await tournament_listing.body()
+    if body is None:
         raise HTTPException(status_code=404, detail="No active tournaments found")
+    joined = await TournamentParticipant.filter(
+        user_id=auth_data.user.id, tournament__finished_at__isnull=True
+    ).values_list("tournament_id", flat=True)
+    return Response(
+        b'{"tournaments":%s,"joined":%s}' % (body, json.dumps(joined).encode()),
+        media_type="application/json",
+    )
 
-    tournaments_data = []
-    for tournament in active_tournaments:
-        participant_list = [
-            {
-                "id": p.id,
-                "user_id": p.user_id,
-                "username": p.user.name,
-                "score": p.score,
-                "place": p.place,
-                "prize": p.prize,
-            }
-            for p in tournament.participants
-        ]
-
-        prize_slots = await tournament.prize_slots.all().prefetch_related("prize")
-
-        tournaments_data.append(
-            {
-                "tournament_id": tournament.id,
-                "tournament_name": tournament.name,
-                "created_at": tournament.created_at.isoformat(),
-                "started_at": (
-                    tournament.started_at.isoformat() if tournament.started_at else None
-                ),
-                "finished_at": (
-                    tournament.finished_at.isoformat()
-                    if tournament.finished_at
-                    else None
-                ),
-                "will_finish_at": tournament.will_finish_at.isoformat(),
-                "type": tournament.type,
-                "prizes": [
-                    {
-                        "place": tp.place,
-                        "type": tp.prize.type,
-                        "title": tp.prize.title,
-                        "link": tp.prize.link,
-                        "media_url": tp.prize.media_url,
-                        "description": tp.prize.description,
-                        "metadata": tp.prize.metadata,
-                    }
-                    for tp in prize_slots
-                ],
-                "participants": participant_list,
-                "participation_cost": tournament.participation_cost,
-                "min_participants": tournament.min_participants,
-                "num_questions": tournament.num_questions,
-                "gamemode": tournament.gamemode,
-                "category": tournament.category,
-                "tags": tournament.tags,
-                "difficulty_multiplier": tournament.difficulty_multiplier,
-                "base_score": tournament.base_score,
-                "tries": tournament.tries,
-            }
-        )
 
-    return JSONResponse(tournaments_data)
+@router.get("/{tournament_id}/participants")
+async def get_tournament_participants(
+    tournament_id: int,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+) -> JSONResponse:
+    participants = TournamentParticipant.filter(tournament_id=tournament_id)
+    page = (
+        await participants.order_by("-score", "id")
+        .offset(offset)
+        .limit(limit)
+        .values("id", "user_id", "score", "place", "prize", username="user__name")
+    )
+    return JSONResponse(
+        {"participants": page, "total_participants": await participants.count()}
+    )
 
 
 @router.post("/{tournament_id}/participate")
@@ -265,11 +225,21 @@ async def start_tournament_match(
             400, detail="You already have an active match in this tournament."
         )
 
-    question_list = await create_tournament_questions(
-        tournament.num_questions,
-        tournament.category,
-        tournament.gamemode,
-        tournament.tags,
+    question_list = await question_pool.take(
+        (
+            "tournament",
+            tournament.category,
+            tournament.gamemode,
+            tournament.num_questions,
+            tuple(tournament.tags or ()),
+        ),
+        partial(
+            create_tournament_questions,
+            tournament.num_questions,
+            tournament.category,
+            tournament.gamemode,
+            tournament.tags,
+        ),
     )
 
     match = await Match.create(
@@ -287,9 +257,13 @@ async def start_tournament_match(
         base_score=tournament.base_score,
         difficulty_multiplier=tournament.difficulty_multiplier,
     )
+    await track_match(match)
+    first_question = (await get_flag_catalog()).decode_question(
+        question_list[0], tournament.gamemode, scored=False
+    )
 
     participant.tries_left -= 1
-    await participant.save()
+    await participant.save(update_fields=["tries_left"])
 
     return JSONResponse(
         {
@@ -297,55 +271,23 @@ async def start_tournament_match(
             "num_questions": tournament.num_questions,
             "current_question": {
                 "index": 0,
-                "flag_id": question_list[0]["flag_id"],
-                "image": question_list[0]["image"],
-                "options": question_list[0]["options"],
-                "mode": question_list[0]["mode"],
+                "flag_id": first_question["flag_id"],
+                "image": first_question["image"],
+                "options": first_question["options"],
+                "mode": first_question["mode"],
             },
         }
     )
 
 
 async def create_tournament_questions(num_questions, category, gamemode, tags) -> List:
-    flags_qs = Flag.all()
-
-    if category and category != "frenzy":
-        flags_qs = flags_qs.filter(category=category)
-
-    if tags:
-        flags_qs = flags_qs.filter(tags__name__in=tags).distinct()
+    catalog = await get_flag_catalog()
+    categories = [category] if category and category != "frenzy" else None
+    sampler = catalog.sampler(categories, tags)
 
-    all_flags = await flags_qs.prefetch_related("tags")
-    all_ids = [f.id for f in all_flags]
-
-    if len(all_ids) < num_questions:
+    if len(sampler) < num_questions:
         raise HTTPException(400, "Not enough flags to create questions")
+    if len(sampler) < NUM_OPTIONS:
+        raise HTTPException(400, "Not enough flags for options")
 
-    question_ids = sample(all_ids, num_questions)
-
-    questions = []
-    for qid in question_ids:
-        flag = next(f for f in all_flags if f.id == qid)
-        image = flag.image
-
-        incorrect_pool = [f for f in all_flags if f.id != qid]
-        if len(incorrect_pool) < 6:
-            raise HTTPException(400, "Not enough flags for options")
-
-        incorrect_options = sample(incorrect_pool, 6)
-        incorrect_names = [f.name for f in incorrect_options]
-        incorrect_names.append(flag.name)
-        options = incorrect_names
-        shuffle(options)
-
-        questions.append(
-            {
-                "flag_id": qid,
-                "image": image,
-                "options": options,
-                "mode": gamemode,
-                "answer": flag.name,
-            }
-        )
-
-    return questions
+    return [sampler.encode_question(flag) for flag in sampler.draw(num_questions)]
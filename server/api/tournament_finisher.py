@@ -0,0 +1,145 @@
+"""Finishing tournaments: places, the finish stamp and the result messages.
+
+:func:`finish_tournament` is shared by ``/finish_tournament`` and the
+background :class:`TournamentFinisher`, which sleeps until the earliest
+``will_finish_at`` of the open tournaments and finishes them on time. Each
+worker runs a finisher; the row lock in :func:`finish_tournament` lets
+only one of them finish a given tournament.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from tortoise.signals import post_save
+from tortoise.transactions import in_transaction
+
+from db import Tournament, TournamentParticipant
+
+from .notifier import NotifyStats, notifier
+
+logger = logging.getLogger(__name__)
+
+# Longest sleep between checks, so tournaments created or moved by other
+# processes are picked up.
+RECHECK_INTERVAL = 60
+MEDALS = {1: "🥇", 2: "🥈", 3: "🥉"}
+
+
+async def finish_tournament(
+    tournament_id: int,
+) -> tuple[Tournament, NotifyStats] | None:
+    """Rank the participants of an open tournament, close it and notify them.
+
+    Returns ``None`` if the tournament does not exist or is already finished.
+    """
+    async with in_transaction() as conn:
+        tournament = (
+            await Tournament.filter(id=tournament_id, finished_at=None)
+            .select_for_update()
+            .using_db(conn)
+            .first()
+        )
+        if tournament is None:
+            return None
+
+        participants = (
+            await TournamentParticipant.filter(tournament_id=tournament_id)
+            .order_by("-score", "id")
+            .using_db(conn)
+        )
+        messages = []
+        for idx, participant in enumerate(participants, start=1):
+            participant.place = idx
+            medal = MEDALS.get(idx)
+            messages.append(
+                (
+                    participant.user_id,
+                    f"🎯 The tournament '{tournament.name}' has finished!\n"
+                    f"Your place: #{idx}{f' {medal}' if medal else ''}\n"
+                    f"Your score: {participant.score}",
+                )
+            )
+        if participants:
+            await TournamentParticipant.bulk_update(
+                participants, fields=["place"], using_db=conn
+            )
+
+        tournament.finished_at = datetime.now(timezone.utc)
+        await tournament.save(update_fields=["finished_at"], using_db=conn)
+
+    stats = await notifier.send_all(messages)
+    logger.info("Tournament %s finished: %s", tournament_id, stats.summary())
+    return tournament, stats
+
+
+class TournamentFinisher:
+    def __init__(self, recheck_interval: float = RECHECK_INTERVAL):
+        self.recheck_interval = recheck_interval
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+
+    def wake(self) -> None:
+        """Look at the schedule again, e.g. after a tournament was created."""
+        self._wakeup.set()
+
+    async def finish_due(self) -> datetime | None:
+        """Finish overdue tournaments; returns the next ``will_finish_at``."""
+        now = datetime.now(timezone.utc)
+        due = await Tournament.filter(
+            finished_at=None, will_finish_at__lte=now
+        ).values_list("id", flat=True)
+        for tournament_id in due:
+            try:
+                await finish_tournament(tournament_id)
+            except Exception:
+                logger.exception("Failed to finish tournament %s", tournament_id)
+
+        return (
+            await Tournament.filter(finished_at=None, will_finish_at__gt=now)
+            .order_by("will_finish_at")
+            .first()
+            .values_list("will_finish_at", flat=True)
+        )
+
+    async def run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            delay = self.recheck_interval
+            try:
+                next_at = await self.finish_due()
+            except Exception:
+                logger.exception("Tournament finisher check failed")
+                next_at = None
+            if next_at is not None:
+                if next_at.tzinfo is None:
+                    next_at = next_at.replace(tzinfo=timezone.utc)
+                until = (next_at - datetime.now(timezone.utc)).total_seconds()
+                delay = max(0.0, min(delay, until))
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+tournament_finisher = TournamentFinisher()
+
+
+@post_save(Tournament)
+async def _tournament_saved(sender, instance, created, using_db, update_fields):
+    if created or not update_fields or "will_finish_at" in update_fields:
+        tournament_finisher.wake()
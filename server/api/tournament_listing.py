@@ -0,0 +1,157 @@
+"""Cached JSON body of ``GET /api/tournaments/all``.
+
+The open tournaments, their prize slots, the ``PREVIEW_SIZE`` best
+participants and the participant counts come from a single query, and the
+serialized body is reused until this process saves or deletes a
+tournament, participant or prize, until the next ``will_finish_at``
+passes, or for at most ``LISTING_TTL`` seconds, which bounds how stale
+changes made by other workers can be. Full participant lists are paged by
+``GET /api/tournaments/{id}/participants``; the endpoint adds the caller's
+own tournaments next to the shared body.
+"""
+
+import json
+from datetime import datetime, timezone
+from time import monotonic
+
+from tortoise import connections
+from tortoise.signals import post_delete, post_save
+
+from db import Prize, Tournament, TournamentParticipant, TournamentPrize
+
+LISTING_TTL = 5
+PREVIEW_SIZE = 10
+
+# $1 - now, $2 - participants per preview.
+LISTING_SQL = """
+SELECT t."id", t."name", t."created_at", t."started_at", t."finished_at",
+       t."will_finish_at", t."type", t."participation_cost",
+       t."min_participants", t."num_questions", t."gamemode", t."category",
+       t."tags", t."difficulty_multiplier", t."base_score", t."tries",
+       (
+           SELECT count(*) FROM "tournamentparticipant" p
+           WHERE p."tournament_id" = t."id"
+       ) AS "total_participants",
+       (
+           SELECT coalesce(json_agg(json_build_object(
+               'id', p."id", 'user_id', p."user_id", 'username', u."name",
+               'score', p."score", 'place', p."place", 'prize', p."prize"
+           ) ORDER BY p."score" DESC, p."id"), '[]')
+           FROM (
+               SELECT * FROM "tournamentparticipant"
+               WHERE "tournament_id" = t."id"
+               ORDER BY "score" DESC, "id"
+               LIMIT $2
+           ) p
+           JOIN "users" u ON u."id" = p."user_id"
+       ) AS "participants",
+       (
+           SELECT coalesce(json_agg(json_build_object(
+               'place', tp."place", 'type', pr."type", 'title', pr."title",
+               'link', pr."link", 'media_url', pr."media_url",
+               'description', pr."description", 'metadata', pr."metadata"
+           ) ORDER BY tp."id"), '[]')
+           FROM "tournamentprize" tp
+           JOIN "prize" pr ON pr."id" = tp."prize_id"
+           WHERE tp."tournament_id" = t."id"
+       ) AS "prizes"
+FROM "tournament" t
+WHERE t."finished_at" IS NULL
+  AND (t."will_finish_at" IS NULL OR t."will_finish_at" > $1)
+ORDER BY t."created_at" DESC
+"""
+
+
+def _isoformat(value: datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+class TournamentListing:
+    def __init__(self, ttl: float = LISTING_TTL, preview_size: int = PREVIEW_SIZE):
+        self.ttl = ttl
+        self.preview_size = preview_size
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        # (version, expires_at, body or None when there are no tournaments)
+        self._cached: tuple[int, float, bytes | None] | None = None
+
+    def invalidate(self) -> None:
+        self.version += 1
+
+    async def body(self) -> bytes | None:
+        """The listing as JSON, ``None`` if no tournament is open."""
+        cached = self._cached
+        if cached and cached[0] == self.version and cached[1] > monotonic():
+            self.hits += 1
+            return cached[2]
+
+        self.misses += 1
+        version = self.version
+        now = datetime.now(timezone.utc)
+        _, rows = await connections.get("default").execute_query(
+            LISTING_SQL, [now, self.preview_size]
+        )
+
+        expires_at = monotonic() + self.ttl
+        tournaments = []
+        for row in rows:
+            if row["will_finish_at"] is not None:
+                # Drop the cache when this tournament closes.
+                left = (row["will_finish_at"] - now).total_seconds()
+                expires_at = min(expires_at, monotonic() + left)
+            tournaments.append(
+                {
+                    "tournament_id": row["id"],
+                    "tournament_name": row["name"],
+                    "created_at": _isoformat(row["created_at"]),
+                    "started_at": _isoformat(row["started_at"]),
+                    "finished_at": _isoformat(row["finished_at"]),
+                    "will_finish_at": _isoformat(row["will_finish_at"]),
+                    "type": row["type"],
+                    "prizes": json.loads(row["prizes"]),
+                    "participants": json.loads(row["participants"]),
+                    "total_participants": row["total_participants"],
+                    "participation_cost": row["participation_cost"],
+                    "min_participants": row["min_participants"],
+                    "num_questions": row["num_questions"],
+                    "gamemode": row["gamemode"],
+                    "category": row["category"],
+                    "tags": json.loads(row["tags"]),
+                    "difficulty_multiplier": row["difficulty_multiplier"],
+                    "base_score": row["base_score"],
+                    "tries": row["tries"],
+                }
+            )
+
+        body = (
+            json.dumps(tournaments, ensure_ascii=False, separators=(",", ":")).encode()
+            if tournaments
+            else None
+        )
+        self._cached = (version, expires_at, body)
+        return body
+
+    def info(self) -> dict:
+        return {"version": self.version, "hits": self.hits, "misses": self.misses}
+
+
+tournament_listing = TournamentListing()
+
+
+@post_save(Tournament, TournamentPrize, Prize)
+async def _listing_saved(sender, instance, created, using_db, update_fields):
+    tournament_listing.invalidate()
+
+
+@post_save(TournamentParticipant)
+async def _participant_saved(sender, instance, created, using_db, update_fields):
+    # Spending a try does not show up in the listing.
+    if update_fields and set(update_fields) <= {"tries_left"}:
+        return
+    tournament_listing.invalidate()
+
+
+@post_delete(Tournament, TournamentParticipant, TournamentPrize, Prize)
+async def _listing_deleted(sender, instance, using_db) -> None:
+    tournament_listing.invalidate()
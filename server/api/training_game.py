@@ -1,10 +1,9 @@
-from random import shuffle, sample
 from typing import List
-from db import Flag, FlagSchema
 from fastapi import APIRouter, Request, Depends, HTTPException
 from fastapi.responses import JSONResponse
 from aiogram.utils.web_app import WebAppInitData
 from .utils import auth, check_user
+from .flag_catalog import NUM_OPTIONS, get_flag_catalog
 
 router = APIRouter(prefix="/api/games/training", dependencies=[Depends(auth)])
 
@@ -14,7 +13,7 @@ async def send_game(
     request: Request,
     auth_data: WebAppInitData = Depends(auth),
 ) -> JSONResponse:
-    user = await check_user(auth_data.user.id)
+    user = await check_user(auth_data.user.id, fresh=True)
 
     query_params = dict(request.query_params)
     num_questions = query_params.get("num_questions")
@@ -28,46 +27,27 @@ async def send_game(
 
 async def create_questions(num_questions, category, gamemode) -> List:
     list_length = int(num_questions)
-    questions = []
+    catalog = await get_flag_catalog()
     if category and category != "frenzy":
-        all_ids = await Flag.filter(category=category).values_list("id", flat=True)
+        sampler = catalog.sampler([category])
     else:
-        all_ids = await Flag.all().values_list("id", flat=True)
+        sampler = catalog.sampler()
 
-    if len(all_ids) < list_length:
+    if len(sampler) < list_length:
         raise HTTPException(
             status_code=400, detail="Not enough flags to create questions"
         )
-    question_ids = sample(all_ids, list_length)
-    for qid in question_ids:
-        flag = await Flag.get(id=qid)
-        flag_data = (await FlagSchema.from_tortoise_orm(flag)).model_dump(mode="json")
-        correct_name = flag_data["name"]
-        image = flag_data["image"]
-
-        
-        incorrect_pool = [i for i in all_ids if i != qid]
-        if len(incorrect_pool) < 6:
-            raise HTTPException(status_code=400, detail="Not enough flags for options")
-
-        incorrect_ids = sample(incorrect_pool, 6)
-
-        
-        incorrect_names = []
-        for iid in incorrect_ids:
-            opt = await Flag.get(id=iid)
-            opt_data = (await FlagSchema.from_tortoise_orm(opt)).model_dump(mode="json")
-            incorrect_names.append(opt_data["name"])
-
-        options = incorrect_names + [correct_name]
-        shuffle(options)
+    if len(sampler) < NUM_OPTIONS:
+        raise HTTPException(status_code=400, detail="Not enough flags for options")
 
+    questions = []
+    for flag in sampler.draw(list_length):
         questions.append(
             {
-                "id": qid,
-                "image": image,
-                "options": options,
-                "answer": correct_name,
+                "id": catalog.ids[flag],
+                "image": catalog.images[flag],
+                "options": sampler.options(flag),
+                "answer": catalog.names[flag],
                 "mode": gamemode,
             }
         )
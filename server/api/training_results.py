@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends
 from aiogram.utils.web_app import WebAppInitData
+from .leaderboard import leaderboards
 from .utils import auth, check_user
 from pydantic import BaseModel
 
@@ -17,9 +18,10 @@ async def submit_answer(
     data: ScoreUpdate,
     auth_data: WebAppInitData = Depends(auth),
 ):
-    user = await check_user(auth_data.user.id)
+    user = await check_user(auth_data.user.id, fresh=True)
 
     user.training_score += data.score
     await user.save()
+    await leaderboards.record(user)
 
     return {"message": "Score updated", "total_score": user.training_score}
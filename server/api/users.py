@@ -1,12 +1,17 @@
+import json
 from datetime import date
-from fastapi import APIRouter, Request, Depends, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Request, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, Response
 from aiogram.utils.web_app import WebAppInitData
-from db import UserSchema, User, UserAchievement, Achievement
+from db import UserSchema, UserAchievement, Achievement
+from .leaderboard import leaderboards, today_score
 from .utils import auth, check_user
 
 router = APIRouter(prefix="/api/users", dependencies=[Depends(auth)])
 
+# Entries shown above and below the caller on the training leaderboard.
+NEIGHBOURS = 5
+
 
 @router.get("/get")
 async def get_user(
@@ -15,10 +20,14 @@ async def get_user(
     user = await check_user(auth_data.user.id)
     today = date.today()
     if user.last_reset_date != today and user.tries_left <= 5:
-        user.tries_left += 3
-        user.last_reset_date = today
-        await user.save()
+        # Check again on the current row before handing out tries.
+        user = await check_user(auth_data.user.id, fresh=True)
+        if user.last_reset_date != today and user.tries_left <= 5:
+            user.tries_left += 3
+            user.last_reset_date = today
+            await user.save()
     user_obj = (await UserSchema.from_tortoise_orm(user)).model_dump(mode="json")
+    user_obj["today_casual_score"] = today_score(user, today)
 
     return JSONResponse({"user": user_obj})
 
@@ -60,72 +69,67 @@ async def get_user_achievements(
 @router.get("/get-casual-leaders")
 async def get_casual_leaders(
     user_id: int = Query(..., description="ID of the current user")
-) -> JSONResponse:
-    
-    top_50 = await User.all().order_by("-casual_score").limit(50)
-    top_today_50 = await User.all().order_by("-today_casual_score").limit(50)
-
-    leaders_dict = {}
-    for leader in top_50:
-        leader_obj = (await UserSchema.from_tortoise_orm(leader)).model_dump(
-            mode="json"
-        )
-        leaders_dict[int(leader_obj["id"])] = {
-            "name": leader_obj["name"],
-            "casual_score": leader_obj["casual_score"],
-        }
-    today_leaders_dict = {}
-    for today_leader in top_today_50:
-        leader_obj = (await UserSchema.from_tortoise_orm(today_leader)).model_dump(
-            mode="json"
-        )
-        today_leaders_dict[int(leader_obj["id"])] = {
-            "name": leader_obj["name"],
-            "today_casual_score": leader_obj["today_casual_score"],
-        }
-
-    
-    user = await User.get(id=user_id)
-
-    
-    user_rank = await User.filter(casual_score__gt=user.casual_score).count() + 1
-    user_today_rank = (
-        await User.filter(today_casual_score__gt=user.today_casual_score).count() + 1
+) -> Response:
+    # The top lists are cached as JSON per board version; only the ranks
+    # are rendered per request.
+    leaders, _ = await leaderboards.top_json("casual", 50, "casual_score")
+    today_leaders, _ = await leaderboards.top_json(
+        "today", 50, "today_casual_score"
     )
-    return JSONResponse(
-        {
-            "leaders": leaders_dict,
-            "today_leaders": today_leaders_dict,
-            "user_rank": user_rank,
-            "user_today_rank": user_today_rank,
-        }
+    user_rank = await leaderboards.rank("casual", user_id)
+    user_today_rank = await leaderboards.rank("today", user_id)
+    return Response(
+        b'{"leaders":%s,"today_leaders":%s,"user_rank":%d,"user_today_rank":%d}'
+        % (leaders, today_leaders, user_rank, user_today_rank),
+        media_type="application/json",
     )
 
 
 @router.get("/get-training-leaders")
 async def get_training_leaders(
-    user_id: int = Query(..., description="ID of the current user")
-) -> JSONResponse:
-    
-    top_50 = await User.all().order_by("-training_score").limit(50)
-
-    leaders_dict = {}
-    for leader in top_50:
-        leader_obj = (await UserSchema.from_tortoise_orm(leader)).model_dump(
-            mode="json"
+    user_id: int = Query(..., description="ID of the current user"),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=100),
+) -> Response:
+    if cursor:
+        try:
+            score, leader_id = cursor.split(":")
+            after = (int(score), int(leader_id))
+        except ValueError:
+            raise HTTPException(400, "Invalid cursor")
+
+        leaders = await leaderboards.page("training", limit, after)
+        return JSONResponse(
+            {
+                "leaders": {
+                    leader_id: {"name": name, "training_score": score}
+                    for leader_id, name, score in leaders
+                },
+                "next_cursor": (
+                    f"{leaders[-1][2]}:{leaders[-1][0]}"
+                    if len(leaders) == limit
+                    else None
+                ),
+            }
         )
-        leaders_dict[int(leader_obj["id"])] = {
-            "name": leader_obj["name"],
-            "training_score": leader_obj["training_score"],
-        }
 
-    
-    user = await User.get(id=user_id)
-
-    
-    user_rank = await User.filter(casual_score__gt=user.casual_score).count() + 1
-
-    return JSONResponse({"leaders": leaders_dict, "user_rank": user_rank})
+    # The first page is cached like the casual boards and also carries the
+    # caller's rank and neighbours.
+    leaders, last = await leaderboards.top_json("training", limit, "training_score")
+    rest = {
+        "next_cursor": f"{last[2]}:{last[0]}" if last else None,
+        "user_rank": await leaderboards.rank("training", user_id),
+        "neighbours": [
+            {"id": uid, "name": name, "training_score": score, "rank": rank}
+            for rank, uid, name, score in await leaderboards.window(
+                "training", user_id, NEIGHBOURS
+            )
+        ],
+    }
+    return Response(
+        b'{"leaders":%s,%s' % (leaders, json.dumps(rest).encode()[1:]),
+        media_type="application/json",
+    )
 
 
 @router.get("/active")
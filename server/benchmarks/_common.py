@@ -0,0 +1,87 @@
+"""Shared setup for the benchmark scripts.
+
+Benchmarks import the application modules, so they need the same ``.env``
+as the server. Run them from the ``server`` directory, e.g.::
+
+    python -m benchmarks.training_queries
+"""
+
+import csv
+import logging
+from time import perf_counter
+
+from tortoise import Tortoise
+from tortoise.log import db_client_logger
+
+from config_reader import ROOT_DIR, TORTOISE_ORM
+
+FLAGS_CSV = ROOT_DIR / "flags280925.csv"
+
+
+async def init_db(db_url: str = "sqlite://:memory:", generate: bool = True) -> None:
+    config = {**TORTOISE_ORM, "connections": {"default": db_url}}
+    await Tortoise.init(config)
+    if generate:
+        await Tortoise.generate_schemas()
+
+
+async def seed_flags() -> None:
+    from db import Flag
+
+    with open(FLAGS_CSV, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+
+    await Flag.bulk_create(
+        [
+            Flag(
+                id=int(row["id"]),
+                name=row["name"],
+                description=row["description"] or None,
+                difficulty=float(row["difficulty"]),
+                image=row["image"],
+                total_shown=int(row["total_shown"]),
+                total_correct=int(row["total_correct"]),
+                category=row["category"],
+            )
+            for row in rows
+        ]
+    )
+
+
+class QueryCounter(logging.Handler):
+    """Counts statements logged by Tortoise's database clients.
+
+    Works inside transactions too, where queries go through a separate
+    client object.
+    """
+
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.count = 0
+        self.statements: list[str] = []
+        self.elapsed = 0.0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if str(record.msg).startswith(("Created connection", "Closed connection")):
+            return
+        self.count += 1
+        self.statements.append(record.getMessage())
+
+    def reset(self) -> None:
+        self.count = 0
+        self.statements.clear()
+
+    def __enter__(self):
+        self._level = db_client_logger.level
+        self._propagate = db_client_logger.propagate
+        db_client_logger.setLevel(logging.DEBUG)
+        db_client_logger.propagate = False
+        db_client_logger.addHandler(self)
+        self._started = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = perf_counter() - self._started
+        db_client_logger.removeHandler(self)
+        db_client_logger.setLevel(self._level)
+        db_client_logger.propagate = self._propagate
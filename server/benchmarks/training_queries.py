@@ -0,0 +1,45 @@
+"""Query count and latency of training game generation.
+
+Fails if generating a 20 question training game costs more round-trips
+than the catalog load (cold) or any at all (warm).
+"""
+
+import asyncio
+
+from tortoise import Tortoise
+
+from api.training_game import create_questions
+from benchmarks._common import QueryCounter, init_db, seed_flags
+
+NUM_QUESTIONS = 20
+ROUNDS = 200
+MAX_COLD_QUERIES = 2
+MAX_WARM_QUERIES = 0
+
+
+async def main() -> None:
+    await init_db()
+    await seed_flags()
+
+    with QueryCounter() as cold:
+        await create_questions(NUM_QUESTIONS, None, "choose")
+
+    with QueryCounter() as warm:
+        for _ in range(ROUNDS):
+            await create_questions(NUM_QUESTIONS, "country", "enter")
+
+    await Tortoise.close_connections()
+
+    print(f"cold: {cold.count} queries, {cold.elapsed * 1000:.2f} ms")
+    print(
+        f"warm: {warm.count / ROUNDS:.2f} queries/game, "
+        f"{warm.elapsed / ROUNDS * 1000:.3f} ms/game"
+    )
+    assert cold.count <= MAX_COLD_QUERIES, f"cold game ran {cold.count} queries"
+    assert (
+        warm.count <= MAX_WARM_QUERIES * ROUNDS
+    ), f"warm games ran {warm.count} queries"
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
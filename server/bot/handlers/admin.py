@@ -1,10 +1,11 @@
-from datetime import datetime, timezone
+from datetime import datetime
 from json import loads as json_loads, JSONDecodeError
 import json
 from aiogram import Router, types
 from aiogram.types import Message
 from aiogram.filters import Command
-from config_reader import bot
+from api.notifier import notifier
+from api import tournament_finisher
 from db import Tournament, SeasonPrize, TournamentPrize, Season, Prize, User
 from tortoise.exceptions import ValidationError
 from config_reader import config
@@ -231,58 +232,15 @@ async def finish_tournament(message: Message):
         await message.answer("⚠️ Tournament ID must be a number.")
         return
 
-    tournament = (
-        await Tournament.filter(id=tournament_id, finished_at=None)
-        .prefetch_related("participants__user")
-        .first()
-    )
-    if not tournament:
+    finished = await tournament_finisher.finish_tournament(tournament_id)
+    if finished is None:
         await message.answer("❌ Tournament not found or already finished.")
         return
 
-    participants = list(tournament.participants)
-    participants.sort(key=lambda p: p.score, reverse=True)
-
-    for idx, participant in enumerate(participants, start=1):
-        participant.place = idx
-        await participant.save()
-        if idx > 3:
-            await bot.send_message(
-                participant.user_id,
-                f"🎯 The tournament '{tournament.name}' has finished!\n"
-                f"Your place: #{idx}\n"
-                f"Your score: {participant.score}",
-            )
-        else:
-            if idx == 1:
-                await bot.send_message(
-                    participant.user_id,
-                    f"🎯 The tournament '{tournament.name}' has finished!\n"
-                    f"Your place: #{idx} 🥇\n"
-                    f"Your score: {participant.score}",
-                )
-            elif idx == 2:
-                await bot.send_message(
-                    participant.user_id,
-                    f"🎯 The tournament '{tournament.name}' has finished!\n"
-                    f"Your place: #{idx} 🥈\n"
-                    f"Your score: {participant.score}",
-                )
-            elif idx == 3:
-                await bot.transfer_gift
-                await bot.send_message(
-                    participant.user_id,
-                    f"🎯 The tournament '{tournament.name}' has finished!\n"
-                    f"Your place: #{idx} 🥉\n"
-                    f"Your score: {participant.score}",
-                )
-
-    tournament.finished_at = datetime.now(timezone.utc)
-    await tournament.save()
-
+    tournament, stats = finished
     await message.answer(
         f"✅ Tournament '{tournament.name}' (ID {tournament.id}) finished.\n"
-        f"Participants have been notified."
+        f"{stats.summary()}"
     )
 
 
@@ -359,6 +317,7 @@ async def cmd_force_end(message: types.Message):
 async def end_season(season: Season):
     print(f"Ending season: {season.title}")
     summary_lines = [f"🏁 Season '{season.title}' ended!"]
+    messages = []
 
     async with in_transaction():
         top_users = await User.all().order_by("-total_score").limit(50)
@@ -379,20 +338,14 @@ async def end_season(season: Season):
             await user.save()
 
             if message_text:
-                try:
-                    await bot.send_message(chat_id=user.id, text=message_text)
-                except Exception as e:
-                    print(f"Failed to send message to {user.name}: {e}")
+                messages.append((user.id, message_text))
 
         season.is_active = False
         await season.save()
 
-    summary_text = "\n".join(summary_lines)
-
-    try:
-        await bot.send_message(chat_id=config.ADMIN_ID, text=summary_text)
-    except Exception as e:
-        print(f"Failed to send summary to admin {config.ADMIN_ID}: {e}")
+    stats = await notifier.send_all(messages)
+    summary_lines += ["", stats.summary()]
+    await notifier.send_all([(config.ADMIN_ID, "\n".join(summary_lines))])
     print(f"Season '{season.title}' ended and rewards distributed.")
 
 
@@ -37,6 +37,18 @@ class Config(BaseSettings):
     APP_HOST: str
     APP_PORT: int
     ADMIN_ID: int
+
+    # question pools
+    QUESTION_POOL_DEPTH: int = 8
+
+    # in-progress match state: unset, memory:// or redis://...
+    MATCH_STORE_URL: str | None = None
+
+    # leaderboards: unset (SQL), memory:// (single process only) or redis://...
+    LEADERBOARD_URL: str | None = None
+
+    # periodic jobs in the app workers; disable to use run_cron.py --serve instead
+    SCHEDULER_ENABLED: bool = True
     model_config = SettingsConfigDict(
         env_file=ROOT_DIR / "server" / ".env", env_file_encoding="utf-8"
     )
@@ -56,10 +68,12 @@ TORTOISE_ORM = {
             "models": [
                 "db.models.user",
                 "db.models.flag",
+                "db.models.alias",
                 "db.models.match",
                 "db.models.tournament",
                 "db.models.season",
                 "db.models.achievement",
+                "db.models.job",
                 "aerich.models",
             ],
             "default_connection": "default",
@@ -101,10 +115,59 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         stack.push_async_callback(Tortoise.close_connections)
         logger.info("Tortoise ORM initialized.")
 
-        # 3️⃣ Регистрация закрытия сессии бота
+        # 3️⃣ Загружаем алиасы ответов
+        from api.aliases import load_aliases
+
+        await load_aliases()
+        logger.info("Answer aliases loaded.")
+
+        # 4️⃣ Фоновое пополнение пулов вопросов
+        from api.question_pool import question_pool
+
+        question_pool.start()
+        stack.push_async_callback(question_pool.stop)
+        logger.info("Question pool producer started.")
+
+        # 5️⃣ Отложенная запись статистики флагов (сбрасывается до закрытия ORM)
+        from api.flag_stats import flag_stats
+
+        flag_stats.start()
+        stack.push_async_callback(flag_stats.stop)
+        logger.info("Flag stats buffer started.")
+
+        # 6️⃣ Хранилище состояния активных матчей
+        from api.match_store import match_store
+
+        if match_store is not None:
+            stack.push_async_callback(match_store.close)
+            logger.info("Match store: %s", type(match_store).__name__)
+
+        # 7️⃣ Лидерборды: собираем из БД (для memory:// и redis://)
+        from api.leaderboard import leaderboards
+
+        await leaderboards.rebuild()
+        stack.push_async_callback(leaderboards.close)
+        logger.info("Leaderboards loaded: %s", leaderboards.info())
+
+        # 8️⃣ Автозавершение турниров по will_finish_at
+        from api.tournament_finisher import tournament_finisher
+
+        tournament_finisher.start()
+        stack.push_async_callback(tournament_finisher.stop)
+        logger.info("Tournament finisher started.")
+
+        # 9️⃣ Регистрация закрытия сессии бота
         stack.push_async_callback(bot.session.close)
         logger.info("Bot session cleanup registered.")
 
+        # 🔟 Планировщик периодических задач (останавливается до закрытия бота)
+        if config.SCHEDULER_ENABLED:
+            from api.scheduler import scheduler
+
+            scheduler.start()
+            stack.push_async_callback(scheduler.stop)
+            logger.info("Scheduler started: %s", scheduler.info())
+
         yield
 
     logger.info("Application lifespan finished.")
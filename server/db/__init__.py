@@ -1,5 +1,6 @@
 from .models.user import User, UserSchema, UserAchievement
 from .models.flag import Flag, FlagSchema, Tag, TagSchema
+from .models.alias import Alias, AliasSchema
 from .models.match import Match, MatchSchema, MatchAnswer, MatchAnswerSchema
 from .models.tournament import (
     Tournament,
@@ -11,5 +12,12 @@ from .models.tournament import (
     TournamentPrize,
     TournamentPrizeSchema,
 )
-from .models.season import Season, SeasonSchema, SeasonPrize, SeasonPrizeSchema
+from .models.season import (
+    Season,
+    SeasonSchema,
+    SeasonPrize,
+    SeasonPrizeSchema,
+    DailyAward,
+)
 from .models.achievement import Achievement
+from .models.job import JobRun
@@ -0,0 +1,26 @@
+from tortoise import BaseDBAsyncClient
+
+# On a large live database create these by hand first with
+# CREATE INDEX CONCURRENTLY; IF NOT EXISTS then makes this a no-op.
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE INDEX IF NOT EXISTS "idx_users_casual_score" ON "users" ("casual_score") INCLUDE ("name");
+CREATE INDEX IF NOT EXISTS "idx_users_today_casual_score" ON "users" ("today_casual_score") INCLUDE ("name");
+CREATE INDEX IF NOT EXISTS "idx_users_training_score" ON "users" ("training_score") INCLUDE ("name");
+CREATE INDEX IF NOT EXISTS "idx_users_total_score" ON "users" ("total_score") INCLUDE ("name");
+CREATE INDEX IF NOT EXISTS "idx_match_user_active" ON "match" ("user_id") WHERE "completed_at" IS NULL;
+CREATE INDEX IF NOT EXISTS "idx_match_user_completed" ON "match" ("user_id", "completed_at");
+CREATE INDEX IF NOT EXISTS "idx_matchanswer_match_correct" ON "matchanswer" ("match_id", "is_correct") INCLUDE ("question_idx", "flag_id");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_users_casual_score";
+DROP INDEX IF EXISTS "idx_users_today_casual_score";
+DROP INDEX IF EXISTS "idx_users_training_score";
+DROP INDEX IF EXISTS "idx_users_total_score";
+DROP INDEX IF EXISTS "idx_match_user_active";
+DROP INDEX IF EXISTS "idx_match_user_completed";
+DROP INDEX IF EXISTS "idx_matchanswer_match_correct";"""
@@ -0,0 +1,19 @@
+from tortoise import BaseDBAsyncClient
+
+# Scores still on the board were earned since the last reset, i.e. today.
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "users" ADD "today_score_date" DATE;
+UPDATE "users" SET "today_score_date" = CURRENT_DATE WHERE "today_casual_score" <> 0;
+DROP INDEX IF EXISTS "idx_users_today_casual_score";
+CREATE INDEX IF NOT EXISTS "idx_users_today_score" ON "users" ("today_score_date", "today_casual_score") INCLUDE ("name");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_users_today_score";
+UPDATE "users" SET "today_casual_score" = 0 WHERE "today_score_date" IS DISTINCT FROM CURRENT_DATE;
+ALTER TABLE "users" DROP COLUMN "today_score_date";
+CREATE INDEX IF NOT EXISTS "idx_users_today_casual_score" ON "users" ("today_casual_score") INCLUDE ("name");"""
@@ -0,0 +1,21 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "job_runs" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "name" VARCHAR(100) NOT NULL,
+    "scheduled_at" TIMESTAMPTZ NOT NULL,
+    "started_at" TIMESTAMPTZ NOT NULL,
+    "finished_at" TIMESTAMPTZ,
+    "duration" DOUBLE PRECISION,
+    "status" VARCHAR(16) NOT NULL DEFAULT 'running',
+    "error" TEXT,
+    CONSTRAINT "uid_job_runs_name_0e1645" UNIQUE ("name", "scheduled_at")
+);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "job_runs";"""
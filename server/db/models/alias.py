@@ -0,0 +1,17 @@
+from tortoise import fields
+from tortoise.models import Model
+from tortoise.contrib.pydantic import pydantic_model_creator
+
+
+class Alias(Model):
+    id = fields.IntField(pk=True)
+    alias = fields.CharField(255, unique=True)
+    flag = fields.ForeignKeyField(
+        "models.Flag", related_name="aliases", on_delete=fields.CASCADE
+    )
+
+    class Meta:
+        table = "aliases"
+
+
+AliasSchema = pydantic_model_creator(Alias)
@@ -0,0 +1,39 @@
+from tortoise.indexes import Index
+
+
+class CoveringIndex(Index):
+    """B-tree index with optional ``INCLUDE`` columns and ``WHERE`` predicate.
+
+    ``INCLUDE`` is Postgres-only and is left out on other backends, so the
+    same models still generate schemas for SQLite.
+    """
+
+    def __init__(
+        self,
+        *,
+        fields: tuple[str, ...],
+        name: str,
+        include: tuple[str, ...] = (),
+        where: str | None = None,
+    ) -> None:
+        super().__init__(fields=fields, name=name)
+        self.include = include
+        self.where = where
+        self.extra = self._extra(include_columns=True)
+
+    def _extra(self, include_columns: bool) -> str:
+        extra = ""
+        if self.include and include_columns:
+            extra += " INCLUDE (" + ", ".join(f'"{c}"' for c in self.include) + ")"
+        if self.where:
+            extra += f" WHERE {self.where}"
+        return extra
+
+    def get_sql(self, schema_generator, model, safe: bool) -> str:
+        return schema_generator._get_index_sql(
+            model,
+            self.field_names,
+            safe,
+            index_name=self.name,
+            extra=self._extra(schema_generator.DIALECT == "postgres"),
+        )
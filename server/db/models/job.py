@@ -0,0 +1,20 @@
+from tortoise import fields
+from tortoise.models import Model
+
+
+class JobRun(Model):
+    """One run of a scheduled job; (name, scheduled_at) is claimed once."""
+
+    id = fields.IntField(pk=True)
+    name = fields.CharField(max_length=100)
+    scheduled_at = fields.DatetimeField()
+    started_at = fields.DatetimeField()
+    finished_at = fields.DatetimeField(null=True)
+    duration = fields.FloatField(null=True)
+    # running, ok, failed or skipped
+    status = fields.CharField(max_length=16, default="running")
+    error = fields.TextField(null=True)
+
+    class Meta:
+        table = "job_runs"
+        unique_together = (("name", "scheduled_at"),)
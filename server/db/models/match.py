@@ -2,6 +2,8 @@ from tortoise import fields
 from tortoise.models import Model
 from tortoise.contrib.pydantic import pydantic_model_creator
 
+from .indexes import CoveringIndex
+
 
 class Match(Model):
     id = fields.UUIDField(pk=True)
@@ -17,6 +19,8 @@ class Match(Model):
     current_question_idx = fields.IntField(default=0)
     current_question_started_at = fields.DatetimeField(null=True)
     questions = fields.JSONField()
+    # Answers given so far; moved to MatchAnswer when the match completes.
+    journal = fields.JSONField(default=list)
 
     gamemode = fields.CharField(max_length=10, null=True)
     category = fields.CharField(max_length=32, null=True)
@@ -32,6 +36,20 @@ class Match(Model):
         "models.TournamentParticipant", related_name="matches", null=True
     )
 
+    class Meta:
+        indexes = (
+            # The unfinished match of a user, looked up on every app open.
+            CoveringIndex(
+                fields=("user_id",),
+                name="idx_match_user_active",
+                where='"completed_at" IS NULL',
+            ),
+            CoveringIndex(
+                fields=("user_id", "completed_at"),
+                name="idx_match_user_completed",
+            ),
+        )
+
 
 class MatchAnswer(Model):
     id = fields.UUIDField(pk=True)
@@ -40,8 +58,19 @@ class MatchAnswer(Model):
     flag_id = fields.IntField()
     user_answer = fields.TextField()
     is_correct = fields.BooleanField()
+    # Points awarded for the answer; null for answers recorded before 52.
+    points = fields.IntField(null=True)
     answered_at = fields.DatetimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = (
+            CoveringIndex(
+                fields=("match_id", "is_correct"),
+                name="idx_matchanswer_match_correct",
+                include=("question_idx", "flag_id"),
+            ),
+        )
+
 
 MatchSchema = pydantic_model_creator(Match)
 MatchAnswerSchema = pydantic_model_creator(MatchAnswer)
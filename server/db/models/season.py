@@ -30,5 +30,15 @@ class SeasonPrize(Model):
         table = "season_prizes"
 
 
+class DailyAward(Model):
+    """A day whose top players already got their bonus tries."""
+
+    day = fields.DateField(pk=True)
+    awarded_at = fields.DatetimeField(auto_now_add=True)
+
+    class Meta:
+        table = "daily_awards"
+
+
 SeasonSchema = pydantic_model_creator(Season)
 SeasonPrizeSchema = pydantic_model_creator(SeasonPrize)
@@ -2,6 +2,8 @@ from tortoise import fields
 from tortoise.models import Model
 from tortoise.contrib.pydantic import pydantic_model_creator
 
+from .indexes import CoveringIndex
+
 
 class User(Model):
     id = fields.BigIntField(pk=True, unique=True)
@@ -19,10 +21,35 @@ class User(Model):
     casual_game = fields.JSONField(null=True)
     training_score = fields.IntField(default=0)
     casual_games_played = fields.IntField(default=0)
+    # Only counts while today_score_date is the current day.
     today_casual_score = fields.IntField(default=0)
+    today_score_date = fields.DateField(null=True)
 
     class Meta:
         table = "users"
+        # Leaderboard top-N and rank counts read the score and the name only.
+        indexes = (
+            CoveringIndex(
+                fields=("casual_score",),
+                name="idx_users_casual_score",
+                include=("name",),
+            ),
+            CoveringIndex(
+                fields=("today_score_date", "today_casual_score"),
+                name="idx_users_today_score",
+                include=("name",),
+            ),
+            CoveringIndex(
+                fields=("training_score",),
+                name="idx_users_training_score",
+                include=("name",),
+            ),
+            CoveringIndex(
+                fields=("total_score",),
+                name="idx_users_total_score",
+                include=("name",),
+            ),
+        )
 
     def __str__(self):
         return f"{self.name} ({self.rating})"
@@ -1,39 +1,60 @@
+"""Run the jobs of :mod:`api.scheduler` outside the app.
+
+``python run_cron.py`` runs every job once and exits, as from system cron;
+``python run_cron.py <job> ...`` runs only the given jobs. Each run is
+claimed for the job's latest scheduled tick, so a job the in-app scheduler
+(or an earlier run) already ran for that tick is skipped.
+``python run_cron.py --serve`` keeps running the jobs on their schedules,
+for deployments that disable the in-app scheduler with
+``SCHEDULER_ENABLED=false``.
+"""
+
+import argparse
 import asyncio
+from datetime import datetime
+
 from tortoise import Tortoise
-from api import cronjobs
-from config_reader import config
-
-TORTOISE_ORM = {
-    "connections": {"default": config.DB_URL.get_secret_value()},
-    "apps": {
-        "models": {
-            "models": [
-                "db.models.user",
-                "db.models.flag",
-                "db.models.match",
-                "db.models.tournament",
-                "db.models.season",
-                "db.models.achievement",
-                "aerich.models",
-            ],
-            "default_connection": "default",
-        },
-    },
-}
-
-
-async def main():
-    # инициализация ORM
-    await Tortoise.init(TORTOISE_ORM)
-    await Tortoise.generate_schemas()  # если нужно создать таблицы, иначе можно убрать
 
-    # запуск задач
-    await cronjobs.reset_today_casual_score()
-    await cronjobs.end_season_if_needed()
+from api.scheduler import scheduler
+from config_reader import TORTOISE_ORM, bot
+
 
-    # закрытие соединений
-    await Tortoise.close_connections()
+async def main(names: list[str], serve: bool):
+    # инициализация ORM (схему создают миграции aerich)
+    await Tortoise.init(TORTOISE_ORM)
+    try:
+        if serve:
+            scheduler.start()
+            await asyncio.Event().wait()
+        else:
+            jobs = {job.name: job for job in scheduler.jobs}
+            now = datetime.now()
+            # запуск задач по очереди, каждая - за свой последний тик
+            for name in names or jobs:
+                job = jobs[name]
+                await scheduler.run_job(job, job.schedule.last_at_or_before(now))
+    finally:
+        # закрытие соединений
+        await scheduler.stop()
+        await bot.session.close()
+        await Tortoise.close_connections()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "jobs",
+        nargs="*",
+        metavar="job",
+        help="jobs to run once (default: all)",
+    )
+    parser.add_argument(
+        "--serve", action="store_true", help="keep running the jobs on schedule"
+    )
+    args = parser.parse_args()
+    if args.serve and args.jobs:
+        parser.error("--serve runs every job and takes no job names")
+    unknown = set(args.jobs) - {job.name for job in scheduler.jobs}
+    if unknown:
+        parser.error(f"unknown jobs: {', '.join(sorted(unknown))}")
+    asyncio.run(main(args.jobs, args.serve))